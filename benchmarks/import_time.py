@@ -0,0 +1,70 @@
+"""
+Import-time benchmark for bytewirez, based on `python -X importtime`.
+
+Every statement is run in a fresh interpreter several times; the cumulative import
+time of the top-level module is reported (best and median, in milliseconds).
+A warm-up run writes the bytecode caches first, so compilation is not measured.
+
+    python benchmarks/import_time.py [-n 10] [--top 15]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATEMENTS = [
+    "import bytewirez",
+    "from bytewirez import Wire",
+    "from bytewirez import StructureReader",
+    "import bytewirez; bytewirez.structure_to_html_viewer",
+]
+
+LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run(stmt: str):
+    """Returns [(self us, cumulative us, depth, module), ...] for one interpreter run."""
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", stmt],
+        cwd=ROOT, env=env, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL,
+        universal_newlines=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if m:
+            rows.append((int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2, m.group(4)))
+    return rows
+
+
+def total_us(rows) -> int:
+    """Cumulative time of the top-level imports made by the statement (startup excluded)."""
+    startup = {"site", "encodings", "zipimport", "_frozen_importlib_external", "codecs", "io", "abc"}
+    return sum(cum for _, cum, depth, name in rows if depth == 0 and name not in startup and not name.startswith("_"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", type=int, default=10, help="runs per statement")
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest modules (self time)")
+    args = parser.parse_args()
+
+    for stmt in STATEMENTS:
+        run(stmt)  # warm-up: bytecode caches
+        samples = [run(stmt) for _ in range(args.n)]
+        times = [total_us(rows) / 1000 for rows in samples]
+        print(f"{stmt:<55} best {min(times):7.2f} ms   median {statistics.median(times):7.2f} ms")
+        if args.top:
+            best = samples[times.index(min(times))]
+            for self_us, _, _, name in sorted(best, reverse=True)[:args.top]:
+                print(f"    {self_us / 1000:7.2f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
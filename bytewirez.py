@@ -1,2 +1,4 @@
 # backward compatibility proxy
+# only the core is imported here, other names are forwarded to the package on first use
 from src.bytewirez.bytewirez import *
+from src.bytewirez import __all__, __dir__, __getattr__
@@ -37,4 +37,8 @@ print(
 
 print(" --- --- --- --- ---")
 
-print( st.output_imHex() )
\ No newline at end of file
+print( st.output_imHex() )
+
+print(" --- --- --- --- ---")
+
+print( st.output_kaitai() )
\ No newline at end of file
@@ -1 +1,84 @@
-from .bytewirez import *
\ No newline at end of file
+"""
+Bytewirez package. Importing it loads only the core (Wire and helpers); everything
+else is imported on first attribute access (PEP 562 module __getattr__), so short-lived
+scripts do not pay for structure tracking, exporters or logging they never use.
+"""
+from .bytewirez import *
+
+# public name -> submodule defining it
+_LAZY = {
+    "StructItem": "structure",
+    "DataItem": "structure",
+    "StructItemObject": "structure",
+    "StructItemList": "structure",
+    "RefItem": "structure",
+    "MagicStructReaderContextManager": "structure",
+    "MagicProxyObject": "structure",
+    "StructureReader": "structure",
+    "structure_to_html_viewer": "export",
+    "custom_json_serializer": "export",
+    "structure_to_yaml": "export",
+    "OffsetIndex": "offset_index",
+    "format_path": "offset_index",
+    "walk_tree": "offset_index",
+    "PagedViewerWriter": "paged_viewer",
+    "structure_to_paged_viewer": "paged_viewer",
+    "ImHexGenerator": "patterns",
+    "KaitaiWriter": "patterns",
+    "structure_to_imhex": "patterns",
+    "structure_to_kaitai": "patterns",
+    "LazyTrace": "trace",
+    "LoadedTrace": "trace",
+    "TraceReader": "trace",
+    "TraceWriter": "trace",
+    "load_trace": "trace",
+    "parse_trace": "trace",
+    "structure_to_trace": "trace",
+    "trace_to_html_viewer": "trace",
+    "trace_to_json": "trace",
+    "trace_to_yaml": "trace",
+    "SharedStore": "cursor",
+    "StoreView": "cursor",
+    "CompressedReader": "compressed",
+    "detect_codec": "compressed",
+    "MultiPatternScanner": "scan",
+    "compile_hex_pattern": "scan",
+    "BlockHashes": "diff",
+    "ByteChange": "diff",
+    "Change": "diff",
+    "block_hashes": "diff",
+    "diff_structures": "diff",
+    "diff_wires": "diff",
+    "iter_diff_wires": "diff",
+    "PatchOverlay": "patch",
+    "Record": "records",
+    "RecordLayout": "records",
+    "RecordList": "records",
+    "Digest": "digest",
+    "checksum": "digest",
+    "SlidingWindow": "window",
+    "WindowError": "window",
+    "columns_from_buffer": "columns",
+    "decode_columns": "columns",
+    "struct_dtype": "columns",
+}
+
+__all__ = [
+    "ENDIAN_BIG", "ENDIAN_LITTLE", "IncrementalNameGenerator", "unpack_ex", "split_fmt", "fmt_fields",
+    "encode_varint", "decode_varint", "gather_write", "FollowCycleError", "DecodeMemo",
+    "make_hookable", "hexdump", "Wire",
+] + list(_LAZY)
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module("." + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
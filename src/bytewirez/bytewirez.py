@@ -1,15 +1,50 @@
 """
 Bytewirez: A library for comfortable binary data reading, writing, and structure tracking.
+
+This is the core (Wire and helpers) and is kept cheap to import: no logging, typing or
+dataclasses at import time. Structure tracking and the exporters live in structure.py
+and export.py and are loaded on first use.
 """
+from __future__ import annotations
+
 import io
 import os
 import struct
-from functools import wraps
 from itertools import count
-from typing import Any, Dict, List, Optional, Tuple, Union, BinaryIO
 
-import logging
-logger = logging.getLogger(__name__)
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+# names that moved out of the core module; still importable from here (see __getattr__)
+_MOVED = {
+    "StructItem": ".structure",
+    "DataItem": ".structure",
+    "StructItemObject": ".structure",
+    "StructItemList": ".structure",
+    "RefItem": ".structure",
+    "MagicStructReaderContextManager": ".structure",
+    "MagicProxyObject": ".structure",
+    "StructureReader": ".structure",
+    "structure_to_html_viewer": ".export",
+    "custom_json_serializer": ".export",
+    "structure_to_yaml": ".export",
+}
+
+
+def _logger():
+    import logging
+    return logging.getLogger(__name__)
+
+
+def __getattr__(name: str):
+    if name == "logger":
+        return _logger()
+    module = _MOVED.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(module, __package__), name)
 
 ENDIAN_BIG    = ">"
 ENDIAN_LITTLE = "<"
@@ -41,11 +76,142 @@ def unpack_ex(fmt: str, data: bytes, into: Optional[List[str]] = None) -> Any:
     return dict(zip(into, parts))
 
 
+def split_fmt(fmt: str) -> Tuple[str, List[Tuple[int, str]]]:
+    """
+    Splits a struct format string into (endian prefix, [(count, code), ...]).
+    e.g. ">I2Hs" -> (">", [(1, "I"), (2, "H"), (1, "s")])
+    """
+    endian = ""
+    if fmt and fmt[0] in "@=<>!":
+        endian, fmt = fmt[0], fmt[1:]
+    parts = []
+    num = ""
+    for ch in fmt:
+        if ch.isdigit():
+            num += ch
+        elif not ch.isspace():
+            parts.append((int(num) if num else 1, ch))
+            num = ""
+    return endian, parts
+
+
+def fmt_fields(fmt: str) -> Tuple[str, List[Tuple[int, str]]]:
+    """
+    Splits a struct format string into (endian prefix, [(offset, field fmt), ...]),
+    one entry per unpacked value; padding is skipped, "s"/"p" counts stay with the field.
+    e.g. ">I2H4s" -> (">", [(0, "I"), (4, "H"), (6, "H"), (8, "4s")])
+    """
+    endian, parts = split_fmt(fmt)
+    fields = []
+    prefix = endian
+    for num, code in parts:
+        items = [f"{num}{code}"] if code in "sp" else [code] * num
+        for item in items:
+            if code != "x":
+                # "0<code>" adds only the alignment padding, so this is the field offset
+                fields.append((struct.calcsize(prefix + "0" + code), item))
+            prefix += item
+    return endian, fields
+
+
+def encode_varint(value: int) -> bytes:
+    """Encodes an unsigned integer as LEB128 varint."""
+    if value < 0:
+        raise ValueError(f"varint: negative value {value}")
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def decode_varint(buf, pos: int = 0) -> Tuple[int, int]:
+    """Decodes an unsigned LEB128 varint from a buffer, returns (value, new position)."""
+    result = 0
+    shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def gather_write(send, chunks: List[bytes], max_chunks: int = 1024) -> int:
+    """
+    Writes all chunks with a vectored send function (os.writev / socket.sendmsg style:
+    takes a list of buffers, returns the number of bytes written), handling partial writes.
+    Written data is removed from `chunks`, so if `send` raises it holds what is still unsent.
+    """
+    total = 0
+    while chunks:
+        n = send(chunks[:max_chunks])
+        total += n
+        done = 0
+        for chunk in chunks[:max_chunks]:
+            if n >= len(chunk):
+                n -= len(chunk)
+                done += 1
+            else:
+                chunks[done] = memoryview(chunk)[n:]
+                break
+        del chunks[:done]
+    return total
+
+
+class FollowCycleError(ValueError):
+    """Raised when following a pointer leads back to a target that is still being decoded."""
+
+
+class DecodeMemo:
+    """
+    Bounded LRU cache of decoded pointer targets, keyed by (offset, decoder).
+    Evicts the least recently used entries above `max_entries` or above `max_bytes`
+    (the number of bytes each target took to decode).
+    """
+    def __init__(self, max_entries: int = 4096, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        # plain dicts keep insertion order: re-inserting a key moves it to the end
+        self._items: Dict[Tuple[int, Any], Tuple[Any, int]] = {}
+
+    def get(self, key: Tuple[int, Any]) -> Optional[Tuple[Any, int]]:
+        """Returns (value, decoded size) or None."""
+        hit = self._items.pop(key, None)
+        if hit is not None:
+            self._items[key] = hit
+        return hit
+
+    def put(self, key: Tuple[int, Any], value: Any, size: int):
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.total_bytes -= old[1]
+        self._items[key] = (value, size)
+        self.total_bytes += size
+        while len(self._items) > self.max_entries or (self.max_bytes is not None and self.total_bytes > self.max_bytes):
+            _, evicted = self._items.pop(next(iter(self._items)))
+            self.total_bytes -= evicted
+
+    def clear(self):
+        self._items.clear()
+        self.total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key) -> bool:
+        return key in self._items
+
+
 def make_hookable(func):
     """Decorator to allow pre and post hooks for instance methods."""
     f_name = func.__name__
 
-    @wraps(func)
     def _new_func(self, *a, **kw):
         pre_hooks = getattr(self, "_pre_hooks", {}).get(f_name, [])
         for hook in pre_hooks:
@@ -60,6 +226,10 @@ def make_hookable(func):
             result = hook(result)
         return result
 
+    # same as functools.wraps, without importing functools
+    for attr in ("__module__", "__name__", "__qualname__", "__doc__"):
+        setattr(_new_func, attr, getattr(func, attr))
+    _new_func.__wrapped__ = func
     setattr(_new_func, '__is_hookable', True)
     return _new_func
 
@@ -128,13 +298,20 @@ class Wire:
         elif from_string is not None:
             self._obj = io.BytesIO(from_string.encode('utf-8'))
         else:
-            logger.info("Initialized with empty BytesIO")
+            _logger().info("Initialized with empty BytesIO")
             self._obj = io.BytesIO(b"")
         
         self._pos_stack: List[int] = []
         self._endian: str = ENDIAN_BIG
         self._pre_hooks: Dict[str, List] = {}
         self._post_hooks: Dict[str, List] = {}
+        self._wbuf: Optional[List[bytes]] = None
+        self._wbuf_size = 0
+        self._wbuf_limit = 0
+        # bytes sent so far when writing to a socket (it has no position of its own)
+        self._sent = 0
+        self._memo: Optional[DecodeMemo] = None
+        self._following: set = set()
         
         self._post_init()
 
@@ -153,13 +330,45 @@ class Wire:
     @classmethod
     def from_string(cls, s: str) -> 'Wire':
         return cls(from_string=s)
-    
+
+    @classmethod
+    def from_compressed(cls, path: str, codec: Optional[str] = None, **kw) -> 'Wire':
+        """Opens a gzip/zlib/bz2/xz file with random access (see compressed.CompressedReader)."""
+        from .compressed import CompressedReader
+        return cls(from_fd=CompressedReader.open(path, codec=codec, **kw))
+
+    @classmethod
+    def from_patched(cls, base, **kw) -> 'Wire':
+        """
+        Edits a read-only base (path, buffer or PatchOverlay) copy-on-write: writes go to
+        an in-memory patch overlay (see patch.PatchOverlay for commit/undo).
+        """
+        from .patch import PatchOverlay
+        return cls(from_fd=base if isinstance(base, PatchOverlay) else PatchOverlay(base, **kw))
+
+    @classmethod
+    def from_stream(cls, stream, window: int = 1 << 20, **kw) -> 'Wire':
+        """
+        Reads an unbounded stream keeping only a bounded window of it in memory
+        (stream is a file-like object or a window.SlidingWindow).
+        """
+        from .window import SlidingWindow
+        if not isinstance(stream, SlidingWindow):
+            stream = SlidingWindow(stream, window=window, **kw)
+        wire = cls(from_fd=stream)
+        stream.hold(wire._pos_stack)
+        return wire
+
     def _post_init(self):
-        for key in dir(self):
-            attr = getattr(self, key)
-            if getattr(attr, '__is_hookable', False):
-                self._pre_hooks[key] = []
-                self._post_hooks[key] = []
+        cls = type(self)
+        # scanning dir() is slow, do it once per class (cursors create many Wires)
+        names = cls.__dict__.get("_hookable_names")
+        if names is None:
+            names = [key for key in dir(cls) if getattr(getattr(cls, key), '__is_hookable', False)]
+            cls._hookable_names = names
+        for key in names:
+            self._pre_hooks[key] = []
+            self._post_hooks[key] = []
         self.initialize()
 
     def initialize(self):
@@ -174,6 +383,27 @@ class Wire:
         if post:
             self._post_hooks[name].append(post)
 
+    def remove_hook(self, func, pre=None, post=None):
+        """Removes hooks installed with install_hook."""
+        name = func.__name__
+        if pre:
+            self._pre_hooks[name].remove(pre)
+        if post:
+            self._post_hooks[name].remove(post)
+
+    def digest(self, algo: str = "crc32", reads: bool = True, writes: bool = True):
+        """
+        Returns a Digest fed with all bytes read/written until it is detached;
+        use as a context manager: `with w.digest("crc32") as d: ...`, then `d.value`.
+        """
+        from .digest import Digest
+        return Digest(algo).attach(self, reads=reads, writes=writes)
+
+    def checksum(self, start: int = 0, end: Optional[int] = None, algo: str = "crc32") -> Union[int, bytes]:
+        """Checksum (crc32/adler32: int) or hash (hashlib name: bytes) of [start, end) without moving the position."""
+        from .digest import checksum
+        return checksum(self, start, end, algo)
+
     def hexdump(self, size: int = 128, start_at: Optional[int] = None) -> str:
         """Returns a hexdump of a portion of the data."""
         blob = self.peek(size, at=start_at)
@@ -181,12 +411,49 @@ class Wire:
 
     def dump(self) -> bytes:
         """Returns the entire contents of the underlying object if possible."""
+        self.flush()
         if hasattr(self._obj, 'getvalue'):
             return self._obj.getvalue()
         # For files, we might need to read all, but that's risky.
         # Original code used getvalue() blindly.
         return b""
 
+    def enable_write_buffer(self, threshold: int = 64 * 1024):
+        """
+        Collects written chunks instead of writing them one by one.
+        They are flushed with a single vectored write (os.writev for raw files,
+        sendmsg for sockets, one joined write otherwise) once `threshold` bytes
+        are pending, on flush() and before any read/seek.
+        """
+        if self._wbuf is None:
+            self._wbuf = []
+            self._wbuf_size = 0
+        self._wbuf_limit = threshold
+
+    def disable_write_buffer(self):
+        """Flushes pending chunks and goes back to direct writes."""
+        self.flush()
+        self._wbuf = None
+
+    def flush(self):
+        """Writes out all chunks collected by the write buffer."""
+        if not self._wbuf:
+            return
+        # chunks leave the buffer only once written: a failed (e.g. would-block) flush keeps them
+        chunks = self._wbuf
+        obj = self._obj
+        try:
+            if hasattr(obj, "sendmsg"):
+                self._sent += gather_write(obj.sendmsg, chunks)
+            elif isinstance(obj, io.FileIO) and hasattr(os, "writev"):
+                fd = obj.fileno()
+                gather_write(lambda batch: os.writev(fd, batch), chunks)
+            else:
+                obj.write(b"".join(chunks))
+                chunks.clear()
+        finally:
+            self._wbuf_size = sum(len(chunk) for chunk in chunks)
+
     def set_endian(self, e: str):
         """Sets the endianness ('>' for big, '<' for little)."""
         assert e in (ENDIAN_BIG, ENDIAN_LITTLE), f"Endian should be {ENDIAN_BIG} or {ENDIAN_LITTLE}"
@@ -228,40 +495,207 @@ class Wire:
 
     def peek(self, size: int, at: Optional[int] = None) -> bytes:
         """Peeks bytes without moving the current position."""
+        if self._wbuf:
+            self.flush()
         self.pushd()
-        if at is not None:
-            if at < 0:
-                self._obj.seek(at, os.SEEK_CUR)
-            else:
-                self._obj.seek(at, os.SEEK_SET)
-        value = self._obj.read(size)
-        self.popd()
+        try:
+            if at is not None:
+                if at < 0:
+                    self._obj.seek(at, os.SEEK_CUR)
+                else:
+                    self._obj.seek(at, os.SEEK_SET)
+            return self._obj.read(size)
+        finally:
+            self.popd()
+
+    def view(self, size: int, at: Optional[int] = None) -> memoryview:
+        """
+        Returns up to `size` bytes as a memoryview without moving the position.
+        No copy is made when the Wire wraps an in-memory buffer (BytesIO, SharedStore cursor);
+        note that a BytesIO cannot be resized while views of it are alive. Such views are
+        read-only on Python 3.8+ (memoryview.toreadonly), do not write through them on 3.7.
+        """
+        if self._wbuf:
+            self.flush()
+        getbuffer = getattr(self._obj, "getbuffer", None)
+        buf = getbuffer() if getbuffer is not None else None
+        if buf is None:
+            return memoryview(self.peek(size, at=at))
+        start = self.get_pos() if at is None else (self.get_pos() + at if at < 0 else at)
+        with buf:
+            view = buf[start:start + size]
+        toreadonly = getattr(view, "toreadonly", None)
+        return toreadonly() if toreadonly is not None else view
+
+    def _read_view(self, size: int) -> memoryview:
+        """
+        Consumes up to `size` bytes as a memoryview (see view()); the position only moves
+        if all of them are there. With read hooks installed (StructureReader, digests) the
+        bytes are read through read() instead, so the hooks see them.
+        """
+        if self._pre_hooks.get("read") or self._post_hooks.get("read"):
+            return memoryview(self.read(size))
+        data = self.view(size)
+        if len(data) == size:
+            self.goto(self.get_pos() + size)
+        return data
+
+    def read_records(self, layout, count: int, into: Optional[List[str]] = None):
+        """
+        Reads `count` consecutive records lazily (see records.RecordList); fields are decoded
+        on first attribute access. `layout` is a RecordLayout or a format string named by `into`.
+        The records are one read() for hooks (StructureReader, digests), which costs a copy.
+        """
+        from .records import RecordLayout, RecordList
+        if not isinstance(layout, RecordLayout):
+            layout = RecordLayout.from_fmt(self.fix_endian(layout), into)
+        size = layout.size * count
+        data = self._read_view(size)
+        if len(data) != size:
+            raise EOFError(f"Failed to read {count} records ({size} bytes), got {len(data)} bytes")
+        return RecordList(layout, data, count=count)
+
+    def set_follow_cache(self, max_entries: int = 4096, max_bytes: Optional[int] = None):
+        """Replaces the memo cache used by follow() (drops everything cached so far)."""
+        self._memo = DecodeMemo(max_entries, max_bytes)
+
+    def follow(self, offset: int, decoder) -> Any:
+        """
+        Decodes the data at `offset` with `decoder(wire)` and comes back to the current position.
+        Results are memoized per (offset, decoder), so the decoder has to be the same object
+        (not a new lambda/partial) for repeated references to hit the cache.
+        Following a target that is still being decoded raises FollowCycleError.
+        """
+        if self._memo is None:
+            self._memo = DecodeMemo()
+        key = (offset, decoder)
+        hit = self._memo.get(key)
+        if hit is not None:
+            self._follow_hit(offset, hit[1])
+            return hit[0]
+        if key in self._following:
+            raise FollowCycleError(f"Pointer cycle: {offset:#x} is already being decoded by {decoder!r}")
+
+        self._following.add(key)
+        self.pushd()
+        try:
+            self.goto(offset)
+            value = decoder(self)
+            size = max(0, self.get_pos() - offset)
+        finally:
+            self.popd()
+            self._following.discard(key)
+        self._memo.put(key, value, size)
         return value
 
+    @make_hookable
+    def _follow_hit(self, offset: int, size: int):
+        """Called when follow() returns a cached target; a hook point for StructureReader."""
+        return None
+
+    def read_columns(self, fmt: str, names: Optional[List[Optional[str]]] = None, count: int = 1, use_numpy: Optional[bool] = None):
+        """
+        Reads `count` consecutive records of `fmt` into columns (see columns.decode_columns):
+        a NumPy structured array if NumPy is installed, else a dict of array.array.
+        The NumPy array is a zero-copy view when the Wire wraps an in-memory buffer and no
+        read hooks are installed (StructureReader, digests see the records as one read()).
+        """
+        from .columns import decode_columns
+        fmt = self.fix_endian(fmt)
+        size = struct.calcsize(fmt) * count
+        data = self._read_view(size)
+        if len(data) != size:
+            raise EOFError(f"Failed to read {count} records ({size} bytes), got {len(data)} bytes")
+        return decode_columns(fmt, data, count, names, use_numpy)
+
+    def _scan_range(self, start: Optional[int], end: Optional[int]) -> Tuple[int, Optional[int]]:
+        return (self.get_pos() if start is None else start), end
+
+    def find_all(
+        self,
+        pattern,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        chunk_size: int = 1 << 20
+    ) -> Iterator[int]:
+        """
+        Yields offsets of all occurrences of a pattern in [start, end) without moving the position.
+        Pattern is bytes, a hex signature with wildcards ("4D 5A ?? ?? 50 45") or a compiled bytes regex.
+        Start defaults to the current position, end to the end of the data.
+        """
+        from .scan import find_all
+        start, end = self._scan_range(start, end)
+        return find_all(lambda at, n: self.peek(n, at=at), pattern, start, end, chunk_size)
+
+    def find(self, pattern, start: Optional[int] = None, end: Optional[int] = None) -> Optional[int]:
+        """Returns the offset of the next occurrence of a pattern (see find_all) or None."""
+        return next(self.find_all(pattern, start, end), None)
+
+    def scan(
+        self,
+        patterns,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        chunk_size: int = 1 << 20
+    ) -> Iterator[Tuple[int, Any]]:
+        """
+        Searches many literal patterns at once (Aho-Corasick), yields (offset, key).
+        `patterns` is a dict {key: bytes}, a list of bytes (keys are indexes) or a MultiPatternScanner.
+        """
+        from .scan import MultiPatternScanner
+        scanner = patterns if isinstance(patterns, MultiPatternScanner) else MultiPatternScanner(patterns)
+        start, end = self._scan_range(start, end)
+        return scanner.scan(lambda at, n: self.peek(n, at=at), start, end, chunk_size)
+
     @make_hookable
     def write(self, b: bytes) -> int:
         """Writes bytes to the stream."""
+        if self._wbuf is not None:
+            self._wbuf.append(b if isinstance(b, bytes) else bytes(b))
+            self._wbuf_size += len(b)
+            if self._wbuf_size >= self._wbuf_limit:
+                self.flush()
+            return len(b)
+        if not hasattr(self._obj, "write") and hasattr(self._obj, "sendall"):
+            self._obj.sendall(b)
+            self._sent += len(b)
+            return len(b)
         return self._obj.write(b)
 
     @make_hookable
     def read(self, n: Optional[int] = None) -> bytes:
         """Reads bytes from the stream."""
+        if self._wbuf:
+            self.flush()
         return self._obj.read(n)
 
     def bytes_available(self) -> int:
         """Returns the number of bytes remaining in the stream."""
+        self.flush()
         pos = self.get_pos()
         self._obj.seek(0, os.SEEK_END)
         end = self.get_pos()
         self._obj.seek(pos, os.SEEK_SET)
         return end - pos
 
+    def get_size(self) -> int:
+        """Returns the total size of the data (position is preserved)."""
+        self.pushd()
+        self.goto_end()
+        size = self.get_pos()
+        self.popd()
+        return size
+
     def get_pos(self) -> int:
-        """Returns the current position."""
-        return self._obj.tell()
+        """Returns the current position (for a socket: the number of bytes written)."""
+        if not hasattr(self._obj, "tell"):
+            return self._sent + self._wbuf_size
+        return self._obj.tell() + self._wbuf_size
 
     def goto(self, p: int):
         """Seeks to an absolute position."""
+        if self._wbuf:
+            self.flush()
         self._obj.seek(p, os.SEEK_SET)
 
     def goto_begin(self):
@@ -270,6 +704,8 @@ class Wire:
 
     def goto_end(self):
         """Seeks to the end of the stream."""
+        if self._wbuf:
+            self.flush()
         self._obj.seek(0, os.SEEK_END)
 
     @make_hookable
@@ -314,6 +750,21 @@ class Wire:
     def read_sdword(self) -> int: return self._read_single("i")
     def read_sqword(self) -> int: return self._read_single("q")
 
+    def read_varint(self) -> int:
+        """Reads an unsigned LEB128 varint."""
+        result = 0
+        shift = 0
+        while True:
+            b = self.read_byte()
+            result |= (b & 0x7F) << shift
+            if b < 0x80:
+                return result
+            shift += 7
+
+    def write_varint(self, val: int) -> int:
+        """Writes an unsigned LEB128 varint."""
+        return self.write(encode_varint(val))
+
     def write_byte(self, val: int): self._write_single("B", val)
     def write_word(self, val: int): self._write_single("H", val)
     def write_dword(self, val: int): self._write_single("I", val)
@@ -324,308 +775,6 @@ class Wire:
     def write_sqword(self, val: int): self._write_single("q", val)
 
 
-
-##
-## Structure reader stuff here
-##
-
-
-from dataclasses import dataclass, field
-
-@dataclass
-class StructItem:
-    """Base class for all structural items."""
-    pos: int = 0
-    size: int = 0
-    kind: str = "ABSTRACT"
-
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "TYPE": self.kind,
-            "POS": self.pos,
-            "SIZE": self.size,
-        }
-
-    def __json__(self) -> Dict[str, Any]:
-        return self.to_dict()
-
-@dataclass
-class DataItem(StructItem):
-    """Represents a leaf node containing raw data."""
-    raw: bytes = b""
-    fmt: Optional[str] = None
-    kind: str = "DATA"
-
-    def to_dict(self) -> Dict[str, Any]:
-        result = super().to_dict()
-        if self.fmt:
-            result["format"] = self.fmt
-            try:
-                unpacked = struct.unpack(self.fmt, self.raw)
-                result["data_fmt"] = unpacked[0] if len(unpacked) == 1 else unpacked
-            except (struct.error, TypeError):
-                logger.warning(f"Failed to unpack data at {self.pos} with format {self.fmt}")
-        
-        result["data_hex"] = self.raw.hex()
-        return result
-
-@dataclass
-class StructItemObject(StructItem):
-    """Represents a collection of named fields."""
-    items: List[Tuple[str, StructItem]] = field(default_factory=list)
-    class_name: Optional[str] = None
-    kind: str = "OBJECT"
-
-    def add(self, name: str, item: StructItem):
-        self.size += item.size
-        self.items.append((name, item))
-
-    def to_dict(self) -> Dict[str, Any]:
-        result = super().to_dict()
-        if self.class_name:
-            result["CLASS"] = self.class_name
-        result['FIELDS'] = self.items
-        return result
-
-
-
-@dataclass
-class StructItemList(StructItem):
-    """Represents a collection of ordered items."""
-    items: List[StructItem] = field(default_factory=list)
-    kind: str = "LIST"
-
-    def add(self, item: StructItem):
-        self.size += item.size
-        self.items.append(item)
-
-    def to_dict(self) -> Dict[str, Any]:
-        result = super().to_dict()
-        result["ITEMS"] = self.items
-        return result
-
-
-
-
-
-class MagicStructReaderContextManager:
-  """
-  Used to provide context-manager for StructureReader
-  """
-  def __init__(self, parent, obj, comment=""):
-    self.parent = parent
-    self.obj = obj
-    self.comment = type(obj).__name__
-    if comment != "" :
-      self.comment + " // " + comment
-
-  def __enter__(self):
-    logger.debug(f" >>>> {self.comment}")
-    self.parent._struct_depth += 1
-
-  def __exit__(self, *a, **kw):
-    self.parent._struct_depth -= 1
-    logger.debug(f" <<<< {self.comment}")
-    self.parent.end_item(*a, **kw)
-
-
-class MagicProxyObject:
-  _parent = None
-
-  def __init__(self, parent):
-    self._parent = parent
-
-  def __getattr__(self, __name: str):
-    if __name.startswith("start_"):
-      return getattr(self._parent,__name)
-    return getattr(self._parent._wire,__name)
-
-class StructureReader:
-    """
-    Tracks the structure of binary data as it is being read from a Wire.
-    """
-    def __init__(self, wire: Wire):
-        self._wire = wire
-        self._item_stack: List[StructItem] = []
-        self._names_stack: List[str] = []
-        self._struct_depth = 0
-        self._last_format: Optional[str] = None
-        self._current_item: Optional[DataItem] = None
-        self._data = bytearray()
-        
-        # Start with a root object
-        root = StructItemObject(pos=self._wire.get_pos())
-        self._item_stack.append(root)
-
-        wire.install_hook(wire.read, pre=self._hook_pre_read, post=self._hook_post_read)
-        wire.install_hook(wire.read_fmt, pre=self._hook_pre_fmt_read, post=self._hook_post_fmt_read)
-
-    def _hook_pre_read(self, size: int, *args, **kwargs):
-        logger.debug(f"HOOK PRE-READ {size}")
-        self._current_item = DataItem(pos=self._wire.get_pos(), size=size, fmt=self._last_format)
-        self._last_format = None
-        return None
-
-    def _hook_post_read(self, result: bytes):
-        if self._current_item is None:
-            logger.error("current_item is None in post-read hook")
-            return result
-            
-        logger.debug(f"HOOK POST-READ {len(result)} bytes")
-        self._current_item.raw = result
-        self._append_to_current(self._current_item)
-        self._current_item = None
-        self._data.extend(result)
-        return result
-
-    def _hook_pre_fmt_read(self, fmt: str, *args, **kwargs):
-        logger.debug(f"HOOK PRE-FMT-READ {fmt}")
-        self._last_format = fmt
-        return None
-
-    def _hook_post_fmt_read(self, result):
-        logger.debug(f"HOOK POST-FMT-READ {result}")
-        return result
-
-    def will_read(self, *names: str) -> MagicProxyObject:
-        """Queues names for the next items to be read."""
-        for name in reversed(names):
-            self._names_stack.append(name)
-        return MagicProxyObject(self)
-
-    def start_object(self, class_name: str = "", comment: str = "") -> MagicStructReaderContextManager:
-        """Starts a new nested object context."""
-        obj = StructItemObject(class_name=class_name, pos=self._wire.get_pos())
-        self._push_item(obj)
-        return MagicStructReaderContextManager(self, obj, comment)
-
-    def start_list(self, comment: str = "") -> MagicStructReaderContextManager:
-        """Starts a new nested list context."""
-        obj = StructItemList(pos=self._wire.get_pos())
-        self._push_item(obj)
-        return MagicStructReaderContextManager(self, obj, comment)
-
-    def _append_to_current(self, o: StructItem):
-        top = self.last_item()
-        if isinstance(top, StructItemObject):
-            name = self._names_stack.pop() if self._names_stack else f"item_{len(top.items):05}"
-            top.add(name, o)
-        elif isinstance(top, StructItemList):
-            top.add(o)
-        else:
-            raise TypeError(f"Cannot append to item of type {type(top)}")
-
-    def _push_item(self, o: StructItem):
-        self._append_to_current(o)
-        self._item_stack.append(o)
-
-    def last_item(self) -> StructItem:
-        return self._item_stack[-1]
-
-    def end_item(self, exc_type, exc_val, exc_tb):
-        """Ends the current structural context."""
-        top = self._item_stack.pop()
-        self.last_item().size += top.size
-        
-        if exc_type:
-            import traceback
-            logger.error(f"Error ending item at depth {len(self._item_stack)}")
-            logger.error(f"Exception: {exc_type.__name__}: {exc_val}")
-            # traceback.print_tb(exc_tb)
-
-    def get_root_element(self) -> StructItem:
-        return self._item_stack[0]
-
-    def get_data(self) -> bytes:
-        return bytes(self._data)
-
-
-
-
-
-    def output_imHex(self) -> str:
-        """Generates imHex pattern language representation."""
-        parts = []
-        root_el = self.get_root_element()
-        counter = IncrementalNameGenerator()
-        
-        # Simple mapping for imHex types
-        IMHEX_TYPES = {
-            ">H": "u16", ">I": "u32", ">Q": "u64", ">B": "u8",
-            "<H": "u16", "<I": "u32", "<Q": "u64", "<B": "u8",
-            "H": "u16", "I": "u32", "Q": "u64", "B": "u8",
-        }
-
-        def _parse(el) -> Tuple[str, int]:
-            if isinstance(el, StructItemList):
-                name = counter.next("ARRAY")
-                struct_lines = [f"struct {name} {{"]
-                for i, item in enumerate(el.items):
-                    item_type, n = _parse(item)
-                    suffix = f"[{n}]" if n > 1 else ""
-                    struct_lines.append(f"  {item_type} ITEM_{i}{suffix};")
-                struct_lines.append("};")
-                parts.append("\n".join(struct_lines))
-                return name, 1
-            
-            if isinstance(el, StructItemObject):
-                name = counter.next("OBJECT")
-                struct_lines = [f"struct {name} {{"]
-                for prop, val in el.items:
-                    item_type, n = _parse(val)
-                    suffix = f"[{n}]" if n > 1 else ""
-                    struct_lines.append(f"  {item_type} {prop}{suffix};")
-                struct_lines.append("};")
-                parts.append("\n".join(struct_lines))
-                return name, 1
-            
-            if isinstance(el, DataItem):
-                return IMHEX_TYPES.get(el.fmt, "u8"), el.size
-            
-            return "u8", 1
-
-        root_name, _ = _parse(root_el)
-        parts.append(f"{root_name} root @ 0x00;")
-        return "\n\n".join(parts)
-
-    def output_kaitai(self):
-        """Placeholder for Kaitai Struct output."""
-        pass
-
-
-def structure_to_html_viewer(st: StructureReader, into_file=None):
-    """Serializes the structure for the HTML viewer."""
-    data = {
-        "data_hex": st.get_data().hex(), 
-        "struct": st.get_root_element()
-    }
-    return custom_json_serializer(data, into_file=into_file)
-
-
-def custom_json_serializer(obj: Any, into_file=None):
-    """JSON serializer that handles objects with __json__ methods."""
-    import json
-
-    def default_handler(o):
-        if hasattr(o, "__json__"):
-            return o.__json__()
-        raise TypeError(f"Object of type {o.__class__.__name__} is not JSON serializable")
-    
-    if into_file is None:
-        return json.dumps(obj, default=default_handler, indent=2)
-    return json.dump(obj, into_file, default=default_handler, indent=2)
-
-
-def structure_to_yaml(reader: StructureReader):
-    """Serializes the structure to YAML."""
-    try:
-        import yaml
-    except ImportError:
-        raise ImportError("PyYAML is required for YAML serialization. Please install it with 'pip install pyyaml'")
-    root = reader.get_root_element()
-    return yaml.dump(root.__json__(), default_flow_style=False)
-
-
 if __name__ == "__main__":
     print("Bytewirez library loaded.")
 
@@ -0,0 +1,117 @@
+"""
+Columnar decoding of runs of fixed-size records.
+
+decode_columns(">IHd", data, count, ["id", "port", "value"]) returns either a NumPy
+structured array (np.frombuffer over the data, no copy) or, without NumPy, a dict of
+array.array columns. Columns are cut out of the run with strided slices, so no Python
+code runs per record. Formats without an array typecode (s, e, ...) become lists; '?'
+becomes a list of bools.
+"""
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from .bytewirez import fmt_fields
+
+ARRAY_CODES = "bBhHiIlLqQfd"
+
+
+def _field_names(n: int, names: Optional[List[Optional[str]]]) -> List[Optional[str]]:
+    names = list(names or [])
+    if len(names) > n:
+        raise struct.error(f"read_columns: more names ({len(names)}) than values ({n})")
+    return names + [f"field_{i}" for i in range(len(names), n)]
+
+
+def _fields(fmt: str, names) -> Tuple[str, List[Tuple[str, int, str]]]:
+    endian, fields = fmt_fields(fmt)
+    out = []
+    for name, (offset, field) in zip(_field_names(len(fields), names), fields):
+        if name is not None:
+            out.append((name, offset, field))
+    return endian, out
+
+
+def struct_dtype(fmt: str, names: Optional[List[Optional[str]]] = None):
+    """NumPy dtype with the layout (offsets, sizes, byte order) of a struct format."""
+    import numpy as np
+    endian, fields = _fields(fmt, names)
+    order = {">": ">", "!": ">", "<": "<"}.get(endian, "=")
+    formats = []
+    for _, _, field in fields:
+        code = field[-1]
+        size = struct.calcsize(endian + field)
+        if code in "sc":
+            formats.append(f"S{size}")
+        elif code == "?":
+            formats.append("?")
+        elif code in "efd":
+            formats.append(f"{order}f{size}")
+        elif code in "bhilqn":
+            formats.append(f"{order}i{size}")
+        elif code in "BHILQNP":
+            formats.append(f"{order}u{size}")
+        else:
+            raise ValueError(f"No NumPy type for struct code {code!r}")
+    return np.dtype({
+        "names": [name for name, _, _ in fields],
+        "formats": formats,
+        "offsets": [offset for _, offset, _ in fields],
+        "itemsize": struct.calcsize(fmt),
+    })
+
+
+def _array_code(field_fmt: str, size: int) -> Optional[str]:
+    code = field_fmt[-1]
+    if code not in "bBhHiIlLqQnNPfd":
+        return None
+    if code in "fd":
+        return code
+    signed = code in "bhilqn"
+    for tc in ARRAY_CODES[:-2]:
+        if array(tc).itemsize == size and tc.islower() == signed:
+            return tc
+    return None
+
+
+def columns_from_buffer(fmt: str, data, count: int, names=None) -> Dict[str, Any]:
+    """Decodes `count` records into {name: array.array or list} without NumPy."""
+    endian, fields = _fields(fmt, names)
+    stride = struct.calcsize(fmt)
+    data = memoryview(data).cast("B")
+    swap = endian in (">", "!") and sys.byteorder == "little" or endian == "<" and sys.byteorder == "big"
+    result: Dict[str, Any] = {}
+    for name, offset, field in fields:
+        size = struct.calcsize(endian + field)
+        col = bytearray(size * count)
+        if count > 0:
+            end = offset + stride * (count - 1) + 1
+            for k in range(size):
+                col[k::size] = data[offset + k:end + k:stride]
+        tc = _array_code(field, size)
+        if tc is None:
+            result[name] = [v[0] for v in struct.iter_unpack(endian + field, col)]
+            continue
+        column = array(tc)
+        column.frombytes(col)
+        if swap and size > 1:
+            column.byteswap()
+        result[name] = column
+    return result
+
+
+def decode_columns(fmt: str, data, count: int, names=None, use_numpy: Optional[bool] = None):
+    """
+    Decodes `count` records of `fmt` from a buffer into columns: a NumPy structured array
+    when NumPy is available (or use_numpy=True), a dict of array.array columns otherwise.
+    """
+    if use_numpy is None or use_numpy:
+        try:
+            import numpy as np
+        except ImportError:
+            if use_numpy:
+                raise
+        else:
+            return np.frombuffer(data, dtype=struct_dtype(fmt, names), count=count)
+    return columns_from_buffer(fmt, data, count, names)
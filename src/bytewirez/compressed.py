@@ -0,0 +1,231 @@
+"""
+Random access over compressed files (gzip, zlib, bz2, xz) with a checkpoint index.
+
+A plain gzip.open() has to restart decompression from the beginning on every backward
+seek. CompressedReader keeps a window of recently decompressed data (so peeks and small
+backward jumps are free) and records checkpoints while reading; a seek outside the window
+resumes from the nearest checkpoint before the target.
+
+zlib-based codecs (gzip/zlib) support copying the decompressor state, so checkpoints are
+taken every `checkpoint_every` bytes of output. bz2/lzma decompressors cannot be copied,
+for them the restart points are the stream boundaries of multi-stream files
+(e.g. output of pbzip2 or concatenated .xz/.bz2 files).
+"""
+import io
+import os
+import zlib
+from bisect import bisect_right
+from typing import BinaryIO, List, Optional, Tuple
+
+
+CODEC_GZIP = "gzip"
+CODEC_ZLIB = "zlib"
+CODEC_BZ2 = "bz2"
+CODEC_XZ = "xz"
+
+INPUT_CHUNK = 64 * 1024
+OUTPUT_CHUNK = 256 * 1024
+
+
+def detect_codec(head: bytes) -> str:
+    """Guesses the codec from the first bytes of a file."""
+    if head.startswith(b"\x1f\x8b"):
+        return CODEC_GZIP
+    if head.startswith(b"BZh"):
+        return CODEC_BZ2
+    if head.startswith(b"\xfd7zXZ\x00"):
+        return CODEC_XZ
+    if len(head) >= 2 and head[0] & 0x0F == 8 and (head[0] * 256 + head[1]) % 31 == 0:
+        return CODEC_ZLIB
+    raise ValueError(f"Unknown compression format (header {head[:6].hex()})")
+
+
+def _new_decompressor(codec: str):
+    if codec == CODEC_GZIP:
+        return zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    if codec == CODEC_ZLIB:
+        return zlib.decompressobj()
+    if codec == CODEC_BZ2:
+        import bz2
+        return bz2.BZ2Decompressor()
+    if codec == CODEC_XZ:
+        import lzma
+        return lzma.LZMADecompressor()
+    raise ValueError(f"Unsupported codec {codec}")
+
+
+class CompressedReader(io.RawIOBase):
+    """Seekable read-only file object over compressed data."""
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        codec: Optional[str] = None,
+        checkpoint_every: int = 4 << 20,
+        window: int = 1 << 20
+    ):
+        super().__init__()
+        self._f = fileobj
+        if codec is None:
+            self._f.seek(0)
+            codec = detect_codec(self._f.read(6))
+        self.codec = codec
+        self._copyable = codec in (CODEC_GZIP, CODEC_ZLIB)
+        self.checkpoint_every = checkpoint_every
+        self.window = window
+        self._out_chunk = max(1, min(OUTPUT_CHUNK, checkpoint_every))
+        self._size: Optional[int] = None
+        self._pos = 0
+        # (uncompressed offset, compressed offset, decompressor copy or None for a fresh stream)
+        self._checkpoints: List[Tuple[int, int, object]] = []
+        self._checkpoint_keys: List[int] = []
+        self._restore((0, 0, None))
+
+    @classmethod
+    def open(cls, path: str, **kw) -> 'CompressedReader':
+        return cls(open(path, "rb"), **kw)
+
+    def _add_checkpoint(self, uoff: int, in_off: int, state):
+        if self._checkpoint_keys and uoff <= self._checkpoint_keys[-1]:
+            return
+        self._checkpoints.append((uoff, in_off, state))
+        self._checkpoint_keys.append(uoff)
+
+    def _restore(self, checkpoint: Tuple[int, int, object]):
+        uoff, in_off, state = checkpoint
+        self._dec = state.copy() if state is not None else _new_decompressor(self.codec)
+        self._f.seek(in_off)
+        self._tail = b""
+        self._needs_input = True
+        self._window = bytearray()
+        self._win_start = self._out_pos = uoff
+        self._last_checkpoint = uoff
+        if state is None:
+            self._add_checkpoint(uoff, in_off, None)
+
+    def _in_offset(self) -> int:
+        return self._f.tell() - len(self._tail)
+
+    def _advance(self) -> bytes:
+        """Returns the next piece of decompressed data, b'' at the end."""
+        while True:
+            if self._dec.eof:
+                leftover = self._dec.unused_data + self._tail
+                while True:
+                    if self.codec == CODEC_GZIP:
+                        # NUL padding after a member is allowed (like gzip's _read_eof)
+                        leftover = leftover.lstrip(b"\x00")
+                    if leftover:
+                        break
+                    leftover = self._f.read(INPUT_CHUNK)
+                    if not leftover:
+                        self._tail = b""
+                        return b""
+                # next gzip member / bz2 or xz stream: a free restart point
+                self._tail = leftover
+                self._add_checkpoint(self._out_pos, self._in_offset(), None)
+                self._dec = _new_decompressor(self.codec)
+                self._needs_input = True
+
+            if self._tail:
+                data, self._tail = self._tail, b""
+            elif self._needs_input:
+                data = self._f.read(INPUT_CHUNK)
+                if not data:
+                    # truncated stream, return whatever is left
+                    return self._dec.flush() if self._copyable else b""
+            else:
+                data = b""
+
+            out = self._dec.decompress(data, self._out_chunk)
+            if self._copyable:
+                self._tail = self._dec.unconsumed_tail
+                self._needs_input = not self._tail
+            else:
+                self._needs_input = self._dec.needs_input
+            if out:
+                return out
+
+    def _fill(self) -> bool:
+        out = self._advance()
+        if not out:
+            self._size = self._out_pos
+            return False
+        self._window += out
+        self._out_pos += len(out)
+        excess = len(self._window) - self.window - self._out_chunk
+        if excess > 0:
+            del self._window[:excess]
+            self._win_start += excess
+        if self._copyable and self._out_pos - self._last_checkpoint >= self.checkpoint_every:
+            self._add_checkpoint(self._out_pos, self._in_offset(), self._dec.copy())
+            self._last_checkpoint = self._out_pos
+        return True
+
+    def _seek_to(self, target: int):
+        """Makes the decompressor produce data up to `target`."""
+        i = bisect_right(self._checkpoint_keys, target) - 1
+        best = self._checkpoints[i] if i >= 0 else None
+        if target < self._win_start or (best is not None and best[0] > self._out_pos):
+            self._restore(best)
+        while self._out_pos <= target:
+            if not self._fill():
+                break
+
+    @property
+    def checkpoints(self) -> List[int]:
+        """Uncompressed offsets of the recorded checkpoints."""
+        return list(self._checkpoint_keys)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.size() - self._pos
+        out = bytearray()
+        while len(out) < size:
+            if not (self._win_start <= self._pos < self._out_pos):
+                self._seek_to(self._pos)
+                if self._pos >= self._out_pos:
+                    break
+            off = self._pos - self._win_start
+            part = self._window[off:off + size - len(out)]
+            out += part
+            self._pos += len(part)
+        return bytes(out)
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def size(self) -> int:
+        """Uncompressed size (decompresses to the end the first time)."""
+        if self._size is None:
+            self._seek_to(1 << 62)
+        return self._size
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            pos = offset
+        elif whence == os.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == os.SEEK_END:
+            pos = self.size() + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if pos < 0:
+            raise ValueError(f"Negative seek position {pos}")
+        self._pos = pos
+        return pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self):
+        if not self.closed:
+            self._f.close()
+        super().close()
@@ -0,0 +1,130 @@
+"""
+Shared backing store with independent cursors.
+
+A Wire keeps its position inside the wrapped file object, so two threads using the
+same Wire move each other's offsets. A SharedStore owns the data once (buffer, mmap or
+file descriptor) and hands out cursors: regular Wire objects over a tiny positional
+view, each with its own position, position stack, endianness and hooks.
+All reads are positional (os.pread / buffer slicing), nothing ever calls seek on the
+shared file, so cursors can be used from many threads without locks.
+"""
+import io
+import mmap
+import os
+from typing import Optional, Union
+
+from .bytewirez import ENDIAN_BIG, Wire
+
+
+class SharedStore:
+    """Read-only data shared by many cursors."""
+    def __init__(self, buffer=None, fd: Optional[int] = None, size: Optional[int] = None, close_fd: bool = False):
+        if (buffer is None) == (fd is None):
+            raise ValueError("SharedStore needs exactly one of buffer or fd")
+        self._view = memoryview(buffer).cast("B") if buffer is not None else None
+        self._buffer = buffer
+        self._fd = fd
+        self._close_fd = close_fd
+        if size is None:
+            size = len(self._view) if self._view is not None else os.fstat(fd).st_size
+        self.size = size
+
+    @classmethod
+    def from_buffer(cls, buf: Union[bytes, bytearray, memoryview, mmap.mmap]) -> 'SharedStore':
+        return cls(buffer=buf)
+
+    @classmethod
+    def from_file(cls, path: str, use_mmap: bool = False) -> 'SharedStore':
+        """Opens a file; uses os.pread when available, mmap otherwise (or when asked)."""
+        if use_mmap or not hasattr(os, "pread"):
+            with open(path, "rb") as f:
+                return cls(buffer=mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        return cls(fd=os.open(path, os.O_RDONLY), close_fd=True)
+
+    @classmethod
+    def from_fd(cls, fd: int) -> 'SharedStore':
+        """Uses an already opened file descriptor (not closed by the store)."""
+        return cls(fd=fd)
+
+    def pread(self, size: int, offset: int) -> bytes:
+        """Reads up to `size` bytes at `offset` without touching any shared position."""
+        if size <= 0 or offset >= self.size:
+            return b""
+        if self._view is not None:
+            return bytes(self._view[offset:offset + size])
+        return os.pread(self._fd, size, offset)
+
+    def cursor(self, pos: int = 0, endian: str = ENDIAN_BIG) -> Wire:
+        """Returns a new Wire reading from this store, starting at `pos`."""
+        wire = Wire.from_fd(StoreView(self, pos))
+        wire.set_endian(endian)
+        return wire
+
+    def close(self):
+        if self._view is not None:
+            self._view.release()
+            if isinstance(self._buffer, mmap.mmap):
+                try:
+                    self._buffer.close()
+                except BufferError:
+                    # views handed out by getbuffer() are still alive: stay usable
+                    self._view = memoryview(self._buffer).cast("B")
+                    raise
+            self._view = None
+        elif self._close_fd and self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *a):
+        self.close()
+
+
+class StoreView(io.RawIOBase):
+    """File-like view of a SharedStore with its own position (one per cursor)."""
+    def __init__(self, store: SharedStore, pos: int = 0):
+        super().__init__()
+        self._store = store
+        self._pos = pos
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._store.size - self._pos
+        data = self._store.pread(size, self._pos)
+        self._pos += len(data)
+        return data
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def getbuffer(self) -> Optional[memoryview]:
+        """The whole shared buffer (None for stores reading through a file descriptor)."""
+        view = self._store._view
+        return view[:] if view is not None else None
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            pos = offset
+        elif whence == os.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == os.SEEK_END:
+            pos = self._store.size + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if pos < 0:
+            raise ValueError(f"Negative seek position {pos}")
+        self._pos = pos
+        return pos
+
+    def tell(self) -> int:
+        return self._pos
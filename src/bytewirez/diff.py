@@ -0,0 +1,241 @@
+"""
+Structural diff between two recorded structures and raw diff between two Wires.
+"""
+import struct
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .bytewirez import Wire
+from .offset_index import format_path
+from .structure import DataItem, RefItem, StructItem, StructItemList, StructItemObject
+
+CHANGED = "changed"
+ADDED = "added"
+REMOVED = "removed"
+TYPE_CHANGED = "type"
+CLASS_CHANGED = "class"
+
+
+@dataclass
+class Change:
+    """One difference between two structure trees."""
+    path: str
+    kind: str
+    old: Any = None
+    new: Any = None
+    offset: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "kind": self.kind,
+            "old": self.old.hex() if isinstance(self.old, bytes) else self.old,
+            "new": self.new.hex() if isinstance(self.new, bytes) else self.new,
+            "offset": self.offset,
+        }
+
+    def __json__(self) -> Dict[str, Any]:
+        return self.to_dict()
+
+
+@dataclass
+class ByteChange:
+    """A run of differing bytes between two Wires."""
+    offset: int
+    old: bytes
+    new: bytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "offset": self.offset,
+            "old": self.old.hex(),
+            "new": self.new.hex(),
+        }
+
+    def __json__(self) -> Dict[str, Any]:
+        return self.to_dict()
+
+
+def _value(item: StructItem) -> Any:
+    """Decoded value of a leaf (or its raw bytes), a short summary for containers."""
+    if isinstance(item, DataItem):
+        if item.fmt:
+            try:
+                unpacked = struct.unpack(item.fmt, item.raw)
+                return unpacked[0] if len(unpacked) == 1 else unpacked
+            except struct.error:
+                pass
+        return item.raw
+    return item.kind
+
+
+def diff_structures(old: StructItem, new: StructItem) -> List[Change]:
+    """
+    Compares two structure trees. Object fields are aligned by name, list items by index.
+    Only values are compared; items that moved but kept their value are not reported.
+    """
+    changes: List[Change] = []
+    # entries are either (path, old item, new item) to compare or a finished Change
+    stack: list = [((), old, new)]
+    while stack:
+        entry = stack.pop()
+        if isinstance(entry, Change):
+            changes.append(entry)
+            continue
+        path, a, b = entry
+        if a is b:
+            continue
+        # compare kinds, not classes: lazily loaded traces use subclasses of the containers
+        if a.kind != b.kind:
+            changes.append(Change(format_path(path), TYPE_CHANGED, a.kind, b.kind, b.pos))
+            continue
+
+        if isinstance(a, DataItem):
+            if a.raw != b.raw or a.fmt != b.fmt:
+                changes.append(Change(format_path(path), CHANGED, _value(a), _value(b), b.pos))
+            continue
+
+        if isinstance(a, RefItem):
+            if a.target != b.target:
+                changes.append(Change(format_path(path), CHANGED, a.target, b.target, b.pos))
+            continue
+
+        pairs = []
+        if isinstance(a, StructItemObject):
+            if a.class_name != b.class_name:
+                changes.append(Change(format_path(path), CLASS_CHANGED, a.class_name, b.class_name, b.pos))
+            b_fields = {}
+            for name, item in b.items:
+                b_fields.setdefault(name, item)
+            a_names = set()
+            for name, item in a.items:
+                if name in a_names:
+                    continue
+                a_names.add(name)
+                if name in b_fields:
+                    pairs.append((path + (name, ), item, b_fields[name]))
+                else:
+                    pairs.append(Change(format_path(path + (name, )), REMOVED, _value(item), None, item.pos))
+            for name, item in b_fields.items():
+                if name not in a_names:
+                    pairs.append(Change(format_path(path + (name, )), ADDED, None, _value(item), item.pos))
+        elif isinstance(a, StructItemList):
+            common = min(len(a.items), len(b.items))
+            pairs = [(path + (i, ), a.items[i], b.items[i]) for i in range(common)]
+            for i in range(common, len(a.items)):
+                pairs.append(Change(format_path(path + (i, )), REMOVED, _value(a.items[i]), None, a.items[i].pos))
+            for i in range(common, len(b.items)):
+                pairs.append(Change(format_path(path + (i, )), ADDED, None, _value(b.items[i]), b.items[i].pos))
+        # reversed, so changes come out in document order
+        stack.extend(reversed(pairs))
+    return changes
+
+
+def _diff_ranges(x: bytes, y: bytes, min_block: int = 64) -> List[Tuple[int, int]]:
+    """Ranges [start, end) where two equally long buffers differ; halves blocks until they are small."""
+    ranges: List[Tuple[int, int]] = []
+    stack = [(0, len(x))]
+    while stack:
+        lo, hi = stack.pop()
+        if x[lo:hi] == y[lo:hi]:
+            continue
+        if hi - lo > min_block:
+            mid = (lo + hi) // 2
+            stack.append((mid, hi))
+            stack.append((lo, mid))
+            continue
+        i = lo
+        while i < hi:
+            if x[i] == y[i]:
+                i += 1
+                continue
+            j = i
+            while j < hi and x[j] != y[j]:
+                j += 1
+            if ranges and ranges[-1][1] == i:
+                ranges[-1] = (ranges[-1][0], j)
+            else:
+                ranges.append((i, j))
+            i = j
+    return ranges
+
+
+class BlockHashes(list):
+    """Digests made by block_hashes, together with the block size they were made with."""
+    def __init__(self, hashes=(), block_size: int = 1 << 16):
+        super().__init__(hashes)
+        self.block_size = block_size
+
+
+def block_hashes(wire: Wire, block_size: int = 1 << 16) -> BlockHashes:
+    """Digests of consecutive blocks of a Wire; can be cached and passed to diff_wires."""
+    import hashlib
+    hashes = BlockHashes(block_size=block_size)
+    for at in range(0, wire.get_size(), block_size):
+        hashes.append(hashlib.blake2b(wire.peek(block_size, at=at), digest_size=16).digest())
+    return hashes
+
+
+def _check_hashes(hashes: Optional[List[bytes]], block_size: int):
+    if hashes is None:
+        return
+    made_with = getattr(hashes, "block_size", None)
+    if made_with is None:
+        raise ValueError("Block hashes do not record their block size, use block_hashes()")
+    if made_with != block_size:
+        raise ValueError(f"Block hashes were made with block_size={made_with}, diff uses {block_size}")
+
+
+def iter_diff_wires(
+    old: Wire,
+    new: Wire,
+    block_size: int = 1 << 16,
+    old_hashes: Optional[List[bytes]] = None,
+    new_hashes: Optional[List[bytes]] = None
+) -> Iterator[ByteChange]:
+    """
+    Compares two Wires block by block and yields runs of differing bytes.
+    Blocks are compared whole first (or by precomputed block_hashes, which skips reading
+    unchanged blocks entirely); only changed blocks are searched for the exact ranges.
+    Bytes past the end of the shorter Wire follow as runs of at most `block_size` bytes.
+    """
+    _check_hashes(old_hashes, block_size)
+    _check_hashes(new_hashes, block_size)
+    old_size = old.get_size()
+    new_size = new.get_size()
+    common = min(old_size, new_size)
+    use_hashes = old_hashes is not None and new_hashes is not None
+    pending: Optional[ByteChange] = None
+
+    for n, at in enumerate(range(0, common, block_size)):
+        if use_hashes and n < len(old_hashes) and n < len(new_hashes) and old_hashes[n] == new_hashes[n]:
+            continue
+        size = min(block_size, common - at)
+        x = old.peek(size, at=at)
+        y = new.peek(size, at=at)
+        if x == y:
+            continue
+        for lo, hi in _diff_ranges(x, y):
+            if pending is not None and pending.offset + len(pending.old) == at + lo:
+                pending = ByteChange(pending.offset, pending.old + x[lo:hi], pending.new + y[lo:hi])
+                continue
+            if pending is not None:
+                yield pending
+            pending = ByteChange(at + lo, x[lo:hi], y[lo:hi])
+    if pending is not None:
+        yield pending
+
+    for at in range(common, max(old_size, new_size), block_size):
+        size = min(block_size, max(old_size, new_size) - at)
+        yield ByteChange(at, old.peek(size, at=at), new.peek(size, at=at))
+
+
+def diff_wires(
+    old: Wire,
+    new: Wire,
+    block_size: int = 1 << 16,
+    old_hashes: Optional[List[bytes]] = None,
+    new_hashes: Optional[List[bytes]] = None
+) -> List[ByteChange]:
+    """List of the runs of differing bytes between two Wires, see iter_diff_wires."""
+    return list(iter_diff_wires(old, new, block_size, old_hashes, new_hashes))
@@ -0,0 +1,102 @@
+"""
+Checksums and hashes computed while data flows through a Wire.
+
+    with w.digest("crc32") as d:
+        payload = w.read(size)
+    assert d.value == w.read_dword()
+
+The digest is fed from the read/write hooks, so no second pass over the data is needed.
+Algorithms: "crc32" and "adler32" (zlib, value is an int) or any hashlib name (value is bytes).
+"""
+import zlib
+from typing import Optional, Union
+
+ZLIB_CHECKSUMS = {"crc32": (zlib.crc32, 0), "adler32": (zlib.adler32, 1)}
+
+
+class Digest:
+    """Incremental checksum/hash with a common interface for zlib and hashlib algorithms."""
+    def __init__(self, algo: str = "crc32"):
+        self.algo = algo.lower()
+        self.size = 0
+        self._hash = None
+        if self.algo in ZLIB_CHECKSUMS:
+            self._func, self._value = ZLIB_CHECKSUMS[self.algo]
+        else:
+            import hashlib
+            self._hash = hashlib.new(self.algo)
+        self._wire = None
+
+    def update(self, data) -> 'Digest':
+        if self._hash is None:
+            self._value = self._func(data, self._value)
+        else:
+            self._hash.update(data)
+        self.size += len(data)
+        return self
+
+    @property
+    def value(self) -> Union[int, bytes]:
+        """The checksum (int) for crc32/adler32, the digest (bytes) for hashlib algorithms."""
+        return self._value if self._hash is None else self._hash.digest()
+
+    def hexdigest(self) -> str:
+        if self._hash is None:
+            return f"{self._value:08x}"
+        return self._hash.hexdigest()
+
+    def attach(self, wire, reads: bool = True, writes: bool = True) -> 'Digest':
+        """Starts feeding the digest from the wire's reads and/or writes."""
+        if self._wire is not None:
+            raise RuntimeError("Digest is already attached to a wire")
+        self._wire = wire
+        self._reads = reads
+        self._writes = writes
+        if reads:
+            wire.install_hook(wire.read, post=self._hook_post_read)
+        if writes:
+            wire.install_hook(wire.write, pre=self._hook_pre_write)
+        return self
+
+    def detach(self):
+        """Stops feeding the digest (the value stays available)."""
+        wire, self._wire = self._wire, None
+        if wire is None:
+            return
+        if self._reads:
+            wire.remove_hook(wire.read, post=self._hook_post_read)
+        if self._writes:
+            wire.remove_hook(wire.write, pre=self._hook_pre_write)
+
+    def _hook_post_read(self, result: bytes) -> bytes:
+        self.update(result)
+        return result
+
+    def _hook_pre_write(self, b, *args, **kwargs):
+        self.update(b)
+        return None
+
+    def __enter__(self) -> 'Digest':
+        return self
+
+    def __exit__(self, *a):
+        self.detach()
+
+    def __repr__(self) -> str:
+        return f"Digest({self.algo}, {self.hexdigest()}, {self.size} bytes)"
+
+
+def checksum(wire, start: int = 0, end: Optional[int] = None, algo: str = "crc32", chunk_size: int = 1 << 20) -> Union[int, bytes]:
+    """Checksum of [start, end) of a wire, read in large chunks (no copies for in-memory buffers)."""
+    if end is None:
+        end = wire.get_size()
+    digest = Digest(algo)
+    pos = start
+    while pos < end:
+        chunk = wire.view(min(chunk_size, end - pos), at=pos)
+        if not chunk:
+            break
+        digest.update(chunk)
+        pos += len(chunk)
+        chunk.release()
+    return digest.value
@@ -0,0 +1,42 @@
+"""
+Serializers for recorded structures: HTML viewer JSON, plain JSON and YAML.
+"""
+from typing import Any
+
+from .structure import StructureReader
+
+
+def structure_to_html_viewer(st: StructureReader, into_file=None, with_index: bool = False):
+    """Serializes the structure for the HTML viewer (optionally with an OffsetIndex)."""
+    data = {
+        "data_hex": st.get_data().hex(), 
+        "struct": st.get_root_element()
+    }
+    if with_index:
+        from .offset_index import OffsetIndex
+        data["index"] = OffsetIndex.build(st.get_root_element())
+    return custom_json_serializer(data, into_file=into_file)
+
+
+def custom_json_serializer(obj: Any, into_file=None):
+    """JSON serializer that handles objects with __json__ methods."""
+    import json
+
+    def default_handler(o):
+        if hasattr(o, "__json__"):
+            return o.__json__()
+        raise TypeError(f"Object of type {o.__class__.__name__} is not JSON serializable")
+    
+    if into_file is None:
+        return json.dumps(obj, default=default_handler, indent=2)
+    return json.dump(obj, into_file, default=default_handler, indent=2)
+
+
+def structure_to_yaml(reader: StructureReader):
+    """Serializes the structure to YAML."""
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("PyYAML is required for YAML serialization. Please install it with 'pip install pyyaml'")
+    root = reader.get_root_element()
+    return yaml.dump(root.__json__(), default_flow_style=False)
@@ -0,0 +1,143 @@
+"""
+Offset index over StructureReader trees: answers "which field covers byte X"
+without walking the whole FIELDS/ITEMS tree for every query.
+"""
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .structure import StructItem, StructItemList, StructItemObject
+
+
+PathPart = Union[str, int]
+
+
+def format_path(path: Tuple[PathPart, ...]) -> str:
+    """Formats a path tuple as 'obj.list[3].field'."""
+    out = ""
+    for part in path:
+        if isinstance(part, int):
+            out += f"[{part}]"
+        else:
+            out += f".{part}" if out else part
+    return out
+
+
+def walk_tree(root: StructItem) -> Iterator[Tuple[int, Tuple[PathPart, ...], StructItem]]:
+    """
+    Iterates (node_id, path, item) in pre-order.
+    Node ids match the numbering used by view.html (root is 0).
+    """
+    node_id = 0
+    stack: List[Tuple[Tuple[PathPart, ...], StructItem]] = [((), root)]
+    while stack:
+        path, item = stack.pop()
+        yield node_id, path, item
+        node_id += 1
+        if isinstance(item, StructItemObject):
+            stack.extend(reversed([(path + (name, ), sub) for name, sub in item.items]))
+        elif isinstance(item, StructItemList):
+            stack.extend(reversed([(path + (i, ), sub) for i, sub in enumerate(item.items)]))
+
+
+class OffsetIndex:
+    """
+    Sorted interval index over the leaf (DATA) items of a structure tree.
+    Leaves are sorted by start; a segment tree of maximum ends over that order (an implicit
+    interval tree) prunes everything that ends too early, so point queries are O(log n)
+    and range queries O((k + 1) log n), also when a long leaf covers many others.
+    """
+    def __init__(self, starts: List[int], ends: List[int], paths: List[str], nodes: List[int]):
+        self.starts = starts
+        self.ends = ends
+        self.paths = paths
+        self.nodes = nodes
+        # _max_end[k]: largest end in the subtree of k; leaves at _leaf + i, k's children 2k, 2k+1
+        leaf = 1
+        while leaf < len(ends):
+            leaf *= 2
+        tree = [-1] * (2 * leaf)
+        tree[leaf:leaf + len(ends)] = ends
+        for k in range(leaf - 1, 0, -1):
+            tree[k] = max(tree[2 * k], tree[2 * k + 1])
+        self._leaf = leaf
+        self._max_end = tree
+
+    @classmethod
+    def build(cls, root: StructItem) -> 'OffsetIndex':
+        """Builds the index from a root element (see StructureReader.get_root_element)."""
+        leaves = []
+        for node_id, path, item in walk_tree(root):
+            if isinstance(item, (StructItemObject, StructItemList)) or item.size <= 0:
+                continue
+            leaves.append((item.pos, item.pos + item.size, node_id, path))
+        leaves.sort(key=lambda x: (x[0], x[2]))
+        return cls(
+            starts=[x[0] for x in leaves],
+            ends=[x[1] for x in leaves],
+            paths=[format_path(x[3]) for x in leaves],
+            nodes=[x[2] for x in leaves],
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _last_ending_after(self, k: int, lo: int, hi: int, limit: int, offset: int) -> Optional[int]:
+        """Largest leaf index < `limit` in the subtree k (leaves [lo, hi)) with end > offset."""
+        if lo >= limit or self._max_end[k] <= offset:
+            return None
+        if hi - lo == 1:
+            return lo
+        mid = (lo + hi) // 2
+        found = self._last_ending_after(2 * k + 1, mid, hi, limit, offset)
+        return found if found is not None else self._last_ending_after(2 * k, lo, mid, limit, offset)
+
+    def _all_ending_after(self, k: int, lo: int, hi: int, limit: int, offset: int, out: List[int]):
+        """Appends (in order) leaf indexes < `limit` in the subtree k with end > offset."""
+        if lo >= limit or self._max_end[k] <= offset:
+            return
+        if hi - lo == 1:
+            out.append(lo)
+            return
+        mid = (lo + hi) // 2
+        self._all_ending_after(2 * k, lo, mid, limit, offset, out)
+        self._all_ending_after(2 * k + 1, mid, hi, limit, offset, out)
+
+    def _covering(self, offset: int) -> Optional[int]:
+        # the last leaf starting at or before offset that still covers it
+        return self._last_ending_after(1, 0, self._leaf, bisect_right(self.starts, offset), offset)
+
+    def lookup(self, offset: int) -> Optional[str]:
+        """Returns the path of the field covering a byte offset (or None)."""
+        i = self._covering(offset)
+        return None if i is None else self.paths[i]
+
+    def lookup_node(self, offset: int) -> Optional[int]:
+        """Returns the pre-order node id of the field covering a byte offset (or None)."""
+        i = self._covering(offset)
+        return None if i is None else self.nodes[i]
+
+    def fields_in_range(self, start: int, end: int) -> List[Tuple[int, int, str]]:
+        """Returns (start, end, path) for every field overlapping [start, end)."""
+        found: List[int] = []
+        self._all_ending_after(1, 0, self._leaf, bisect_left(self.starts, end), start, found)
+        return [(self.starts[i], self.ends[i], self.paths[i]) for i in found]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "starts": self.starts,
+            "ends": self.ends,
+            "paths": self.paths,
+            "nodes": self.nodes,
+        }
+
+    def __json__(self) -> Dict[str, Any]:
+        return self.to_dict()
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> 'OffsetIndex':
+        return cls(
+            starts=list(d["starts"]),
+            ends=list(d["ends"]),
+            paths=list(d["paths"]),
+            nodes=list(d["nodes"]),
+        )
@@ -0,0 +1,185 @@
+"""
+Paginated export for the HTML viewer.
+
+Instead of one JSON blob, writes a directory with:
+  manifest.json    - data size, chunk list and the (possibly stubbed) root node
+  data/NNNNN.bin   - raw data split into fixed-size chunks
+  tree/NNNNNN.json - one page of children of a big container (a "shard")
+
+Big containers are written as stubs with a "PAGES" list, small subtrees are inlined.
+view.html loads pages and data chunks only when they are needed, and unloads pages that
+were scrolled out of view long ago, so the browser holds a bounded part of the tree.
+"""
+import json
+import os
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+from .bytewirez import Wire
+from .structure import DataItem, StructItem, StructItemList, StructItemObject, StructureReader
+
+
+MANIFEST_NAME = "manifest.json"
+PAGED_FORMAT_VERSION = 1
+
+
+def _children(item: StructItem) -> Optional[list]:
+    if isinstance(item, StructItemObject):
+        return [sub for _, sub in item.items]
+    if isinstance(item, StructItemList):
+        return item.items
+    return None
+
+
+def _subtree_fits(item: StructItem, limit: int) -> bool:
+    """Checks if a subtree has at most `limit` nodes (stops counting early)."""
+    stack = [item]
+    while stack:
+        limit -= 1
+        if limit < 0:
+            return False
+        node = stack.pop()
+        if isinstance(node, StructItemObject):
+            stack.extend(sub for _, sub in node.items)
+        elif isinstance(node, StructItemList):
+            stack.extend(node.items)
+    return True
+
+
+def _node_header(item: StructItem) -> Dict[str, Any]:
+    """Node dict without children and without hex (the data lives in chunks)."""
+    if isinstance(item, DataItem):
+        return item.to_dict(with_hex=False)
+    result = item.to_dict()
+    result.pop("FIELDS", None)
+    result.pop("ITEMS", None)
+    return result
+
+
+def _inline(item: StructItem) -> Dict[str, Any]:
+    result = _node_header(item)
+    if isinstance(item, StructItemObject):
+        result["FIELDS"] = [[name, _inline(sub)] for name, sub in item.items]
+    elif isinstance(item, StructItemList):
+        result["ITEMS"] = [_inline(sub) for sub in item.items]
+    return result
+
+
+class PagedViewerWriter:
+    """
+    Writes the paginated viewer format into a directory.
+    Pages are written as soon as they are produced, so only one page is held at a time.
+    """
+    def __init__(
+        self,
+        into_dir: str,
+        chunk_size: int = 1 << 20,
+        page_items: int = 1000,
+        inline_nodes: int = 256
+    ):
+        self.into_dir = into_dir
+        self.chunk_size = chunk_size
+        self.page_items = page_items
+        self.inline_nodes = inline_nodes
+        self._shard_count = 0
+        self._pending: Deque[Tuple[StructItem, List[str]]] = deque()
+        os.makedirs(os.path.join(into_dir, "data"), exist_ok=True)
+        os.makedirs(os.path.join(into_dir, "tree"), exist_ok=True)
+
+    def _write_json(self, rel_path: str, obj: Any):
+        with open(os.path.join(self.into_dir, rel_path), "w") as f:
+            json.dump(obj, f, separators=(",", ":"))
+
+    def write_data(self, source: Union[bytes, bytearray, memoryview, Wire]) -> Tuple[int, List[str]]:
+        """Splits the data into chunk files. Returns (total size, chunk paths)."""
+        if not isinstance(source, Wire):
+            with memoryview(source) as view:
+                return self._write_chunks(len(view), lambda at, n: view[at:at + n])
+
+        return self._write_chunks(source.get_size(), lambda at, n: source.peek(n, at=at))
+
+    def _write_chunks(self, total: int, read_at) -> Tuple[int, List[str]]:
+        chunks = []
+        for n, at in enumerate(range(0, total, self.chunk_size)):
+            rel_path = f"data/{n:05}.bin"
+            with open(os.path.join(self.into_dir, rel_path), "wb") as f:
+                f.write(read_at(at, self.chunk_size))
+            chunks.append(rel_path)
+        return total, chunks
+
+    def _ref(self, item: StructItem) -> Dict[str, Any]:
+        """Serializes an item for its parent: inline if small, otherwise a stub with pages."""
+        children = _children(item)
+        if children is None or _subtree_fits(item, self.inline_nodes):
+            return _inline(item)
+
+        result = _node_header(item)
+        pages = []
+        hrefs = []
+        for first in range(0, len(children), self.page_items):
+            part = children[first:first + self.page_items]
+            href = f"tree/{self._shard_count:06}.json"
+            self._shard_count += 1
+            hrefs.append(href)
+            pages.append({
+                "href": href,
+                "first": first,
+                "count": len(part),
+                "POS": part[0].pos,
+                "SIZE": sum(sub.size for sub in part),
+            })
+        result["PAGES"] = pages
+        self._pending.append((item, hrefs))
+        return result
+
+    def _write_pages(self, item: StructItem, hrefs: List[str]):
+        for n, href in enumerate(hrefs):
+            first = n * self.page_items
+            part = item.items[first:first + self.page_items]
+            if isinstance(item, StructItemObject):
+                self._write_json(href, {"FIELDS": [[name, self._ref(sub)] for name, sub in part]})
+            else:
+                self._write_json(href, {"ITEMS": [self._ref(sub) for sub in part]})
+
+    def write_tree(self, root: StructItem) -> Dict[str, Any]:
+        """Writes all shards, returns the root node for the manifest."""
+        root_ref = self._ref(root)
+        while self._pending:
+            self._write_pages(*self._pending.popleft())
+        return root_ref
+
+    def write(self, root: StructItem, source: Union[bytes, bytearray, memoryview, Wire]) -> str:
+        """Writes data chunks, tree shards and the manifest. Returns the manifest path."""
+        total, chunks = self.write_data(source)
+        manifest = {
+            "version": PAGED_FORMAT_VERSION,
+            "data_size": total,
+            "chunk_size": self.chunk_size,
+            "chunks": chunks,
+            "root": self.write_tree(root),
+        }
+        self._write_json(MANIFEST_NAME, manifest)
+        return os.path.join(self.into_dir, MANIFEST_NAME)
+
+
+def structure_to_paged_viewer(
+    st: StructureReader,
+    into_dir: str,
+    source: Optional[Union[bytes, bytearray, memoryview, Wire]] = None,
+    chunk_size: int = 1 << 20,
+    page_items: int = 1000,
+    inline_nodes: int = 256
+) -> str:
+    """
+    Exports the structure in the paginated viewer format (see module docstring).
+    `source` is the data to chunk, by default the data recorded by the reader, which is the
+    whole capture held in memory. When the reads were not contiguous (skipped bytes, goto or
+    peek), the recorded data does not line up with the offsets and the reader's Wire is
+    used instead. For large captures pass `source=wire`: chunks are then streamed from the
+    Wire, and the data does not have to be kept by the reader.
+    Returns the path of the manifest; serve the directory over http and open it in view.html.
+    """
+    if source is None:
+        source = st._data if st._contiguous else st._wire
+    writer = PagedViewerWriter(into_dir, chunk_size=chunk_size, page_items=page_items, inline_nodes=inline_nodes)
+    return writer.write(st.get_root_element(), source)
@@ -0,0 +1,242 @@
+"""
+Copy-on-write patch overlay for editing big files without loading them.
+
+The base data (file, mmap or buffer) is never modified while editing. Writes are kept
+as pieces in a sorted map of non-overlapping intervals; a write only cuts the pieces it
+overlaps (views, nothing is copied) and reads merge the base with the pieces. Every write
+remembers the pieces it replaced, so undo() just puts them back.
+commit() writes only the dirty ranges into the base file, or streams the merged data
+into a new file.
+"""
+import io
+import os
+from bisect import bisect_left, bisect_right
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+from .bytewirez import ENDIAN_BIG, Wire
+from .cursor import SharedStore
+
+COPY_CHUNK = 1 << 20
+
+
+class PatchOverlay(io.RawIOBase):
+    """Seekable read/write file object: read-only base + in-memory patches."""
+    def __init__(self, base: Union[str, bytes, bytearray, memoryview, SharedStore, BinaryIO], use_mmap: bool = False):
+        super().__init__()
+        self._path: Optional[str] = None
+        self._use_mmap = use_mmap
+        # a SharedStore passed in belongs to the caller and is never closed here
+        self._owns_base = not isinstance(base, SharedStore)
+        if isinstance(base, str):
+            self._path = base
+            base = SharedStore.from_file(base, use_mmap=use_mmap)
+        elif isinstance(base, (bytes, bytearray, memoryview)):
+            base = SharedStore.from_buffer(base)
+        elif not isinstance(base, SharedStore):
+            base = SharedStore.from_fd(base.fileno())
+        self._base = base
+        self._base_size = base.size
+        # patched pieces, sorted and non-overlapping; each one is the data of one write or a
+        # view cut out of it, so a write never copies its neighbours
+        self._starts: List[int] = []
+        self._chunks: List[Union[bytes, memoryview]] = []
+        # per write: (index, number of pieces it put there, pieces it replaced)
+        self._history: List[Tuple[int, int, Tuple[int, ...], Tuple[Union[bytes, memoryview], ...]]] = []
+        self._size = self._base_size
+        self._pos = 0
+
+    @classmethod
+    def open(cls, path: str, use_mmap: bool = False) -> 'PatchOverlay':
+        return cls(path, use_mmap=use_mmap)
+
+    def wire(self, endian: str = ENDIAN_BIG) -> Wire:
+        """Returns a Wire reading and writing through this overlay."""
+        wire = Wire.from_fd(self)
+        wire.set_endian(endian)
+        return wire
+
+    def _recompute_size(self):
+        end = self._starts[-1] + len(self._chunks[-1]) if self._starts else 0
+        self._size = max(self._base_size, end)
+
+    def patch(self, offset: int, data: bytes):
+        """Overlays `data` at `offset` (writing past the end grows the data, gaps read as zeros)."""
+        if offset < 0:
+            raise ValueError(f"Negative patch offset {offset}")
+        if not data:
+            return
+        end = offset + len(data)
+        starts, chunks = self._starts, self._chunks
+        # pieces overlapping [offset, end); the ones sticking out are cut (views, no copy)
+        lo = bisect_right(starts, offset) - 1
+        if lo < 0 or starts[lo] + len(chunks[lo]) <= offset:
+            lo += 1
+        hi = bisect_left(starts, end)
+        new_starts = [offset]
+        new_chunks = [bytes(data)]
+        if lo < hi:
+            if starts[lo] < offset:
+                new_starts.insert(0, starts[lo])
+                new_chunks.insert(0, memoryview(chunks[lo])[:offset - starts[lo]])
+            tail_at, tail = starts[hi - 1], chunks[hi - 1]
+            if tail_at + len(tail) > end:
+                new_starts.append(end)
+                new_chunks.append(memoryview(tail)[end - tail_at:])
+        # undo keeps only the pieces this write covered
+        self._history.append((lo, len(new_starts), tuple(starts[lo:hi]), tuple(chunks[lo:hi])))
+        starts[lo:hi] = new_starts
+        chunks[lo:hi] = new_chunks
+        self._recompute_size()
+
+    def undo(self):
+        """Drops the most recent write."""
+        if not self._history:
+            raise IndexError("undo with no patches")
+        idx, count, starts, chunks = self._history.pop()
+        self._starts[idx:idx + count] = starts
+        self._chunks[idx:idx + count] = chunks
+        self._recompute_size()
+
+    def discard(self):
+        """Drops all patches."""
+        self._starts.clear()
+        self._chunks.clear()
+        self._history.clear()
+        self._size = self._base_size
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._starts)
+
+    def _runs(self) -> Iterator[Tuple[int, List[Union[bytes, memoryview]]]]:
+        """Contiguous patched runs: (start, [pieces])."""
+        run_start, run_end, run = 0, -1, []
+        for at, chunk in zip(self._starts, self._chunks):
+            if at != run_end:
+                if run:
+                    yield run_start, run
+                run_start, run = at, []
+            run.append(chunk)
+            run_end = at + len(chunk)
+        if run:
+            yield run_start, run
+
+    def dirty_ranges(self) -> List[Tuple[int, int]]:
+        """Patched [start, end) ranges."""
+        return [(at, at + sum(map(len, run))) for at, run in self._runs()]
+
+    def read_at(self, offset: int, size: int) -> bytes:
+        """Merged data at `offset`, without moving the position."""
+        size = min(size, self._size - offset)
+        if size <= 0:
+            return b""
+        end = offset + size
+        i = bisect_right(self._starts, offset) - 1
+        if i < 0 or self._starts[i] + len(self._chunks[i]) <= offset:
+            i += 1
+        # fast path: entirely inside the base or entirely inside a single patch
+        if i >= len(self._starts) or self._starts[i] >= end:
+            if end <= self._base_size:
+                return self._base.pread(size, offset)
+        elif self._starts[i] <= offset and self._starts[i] + len(self._chunks[i]) >= end:
+            at = offset - self._starts[i]
+            return bytes(self._chunks[i][at:at + size])
+
+        out = bytearray(size)
+        if offset < self._base_size:
+            base = self._base.pread(min(end, self._base_size) - offset, offset)
+            out[:len(base)] = base
+        while i < len(self._starts) and self._starts[i] < end:
+            at, chunk = self._starts[i], self._chunks[i]
+            lo = max(at, offset)
+            hi = min(at + len(chunk), end)
+            out[lo - offset:hi - offset] = chunk[lo - at:hi - at]
+            i += 1
+        return bytes(out)
+
+    def commit(self, into: Optional[Union[str, BinaryIO]] = None):
+        """
+        Without `into`: writes the dirty ranges into the base file (it has to be opened by path).
+        With `into` (path or file object): streams the merged data there; the base is untouched.
+        Patches are dropped in the first case only.
+        """
+        if into is not None and not (
+            isinstance(into, str) and self._path is not None
+            and os.path.exists(into) and os.path.samefile(into, self._path)
+        ):
+            if isinstance(into, str):
+                with open(into, "wb") as f:
+                    self._copy_to(f)
+            else:
+                self._copy_to(into)
+            return
+
+        if self._path is None:
+            raise ValueError("In-place commit needs an overlay opened from a path")
+        with open(self._path, "r+b") as f:
+            for at, run in self._runs():
+                if at > self._base_size:
+                    # gap after the old end reads as zeros
+                    f.seek(self._base_size)
+                    f.write(bytes(at - self._base_size))
+                f.seek(at)
+                f.write(b"".join(run))
+        # reopen, the size (and an mmap) may be stale
+        if self._owns_base:
+            self._base.close()
+        self._base = SharedStore.from_file(self._path, use_mmap=self._use_mmap)
+        self._owns_base = True
+        self._base_size = self._base.size
+        self.discard()
+
+    def _copy_to(self, f: BinaryIO):
+        for at in range(0, self._size, COPY_CHUNK):
+            f.write(self.read_at(at, COPY_CHUNK))
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._size - self._pos
+        data = self.read_at(self._pos, size)
+        self._pos += len(data)
+        return data
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def write(self, b) -> int:
+        self.patch(self._pos, bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            pos = offset
+        elif whence == os.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == os.SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if pos < 0:
+            raise ValueError(f"Negative seek position {pos}")
+        self._pos = pos
+        return pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self):
+        if not self.closed and self._owns_base:
+            self._base.close()
+        super().close()
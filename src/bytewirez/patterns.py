@@ -0,0 +1,348 @@
+"""
+Pattern generators for recorded structures.
+Structurally identical subtrees are emitted as a single type (hash-consing),
+homogeneous lists become arrays of that type.
+"""
+import re
+import struct
+import sys
+from typing import Dict, List, Optional, Set, Tuple
+
+from .bytewirez import IncrementalNameGenerator, fmt_fields, split_fmt
+from .structure import DataItem, StructItem, StructItemList, StructItemObject
+
+
+IMHEX_TYPES = {
+    "x": "padding", "c": "char", "?": "bool",
+    "b": "s8", "h": "s16", "i": "s32", "l": "s32", "q": "s64", "n": "s64",
+    "B": "u8", "H": "u16", "I": "u32", "L": "u32", "Q": "u64", "N": "u64", "P": "u64",
+    "e": "u16", "f": "float", "d": "double",
+    "s": "char", "p": "char",
+}
+IMHEX_ENDIAN = {">": "be ", "!": "be ", "<": "le "}
+SINGLE_BYTE_CODES = "xcbB?sp"
+
+# (type name, array length)
+FieldType = Tuple[str, int]
+
+
+def _ident(name) -> str:
+    """Makes a safe identifier out of a field/class name."""
+    result = re.sub(r"\W", "_", str(name))
+    if not result or result[0].isdigit():
+        result = "_" + result
+    return result
+
+
+class ImHexGenerator:
+    """Builds imHex pattern source, defining each distinct struct layout once."""
+    def __init__(self):
+        self.parts: List[str] = []
+        self._types: Dict[tuple, str] = {}
+        self._used_names: Set[str] = set()
+        self._counter = IncrementalNameGenerator()
+
+    def _new_name(self, base: str) -> str:
+        name = base
+        if name in self._used_names or base in ("OBJECT", "ARRAY", "FORMAT"):
+            name = self._counter.next(base)
+        self._used_names.add(name)
+        return name
+
+    @staticmethod
+    def _field_line(type_name: str, name: str, n: int) -> str:
+        if type_name == "padding":
+            return f"  padding[{n}];"
+        suffix = f"[{n}]" if n > 1 else ""
+        return f"  {type_name} {name}{suffix};"
+
+    def _define(self, sig: tuple, base: str, fields: List[Tuple[str, str, int]]) -> str:
+        name = self._types.get(sig)
+        if name is None:
+            name = self._new_name(base)
+            self._types[sig] = name
+            lines = [f"struct {name} {{"]
+            lines.extend(self._field_line(*f) for f in fields)
+            lines.append("};")
+            self.parts.append("\n".join(lines))
+        return name
+
+    @staticmethod
+    def _scalar(endian: str, code: str) -> str:
+        type_name = IMHEX_TYPES.get(code, "u8")
+        if code in SINGLE_BYTE_CODES:
+            return type_name
+        return IMHEX_ENDIAN.get(endian, "") + type_name
+
+    def _leaf(self, el: DataItem) -> FieldType:
+        if not el.fmt:
+            return "u8", el.size
+        endian, parts = split_fmt(el.fmt)
+        if not parts:
+            return "u8", el.size
+        if len(parts) == 1:
+            n, code = parts[0]
+            return self._scalar(endian, code), n
+        # multi-value format like "IBB": one struct per distinct format
+        fields = [(self._scalar(endian, code), f"v{i}", n) for i, (n, code) in enumerate(parts)]
+        return self._define(("F", el.fmt), "FORMAT", fields), 1
+
+    def parse(self, el: StructItem) -> Optional[FieldType]:
+        """Returns the (type, count) describing an element, defining types as needed."""
+        if isinstance(el, StructItemList):
+            results = [self.parse(item) for item in el.items]
+            results = [r for r in results if r is not None]
+            if not results:
+                return None
+            first = results[0]
+            if first[1] == 1 and first[0] != "padding" and all(r == first for r in results):
+                return first[0], len(results)
+            fields = [(t, f"ITEM_{i}", n) for i, (t, n) in enumerate(results)]
+            return self._define(("L", tuple(fields)), "ARRAY", fields), 1
+
+        if isinstance(el, StructItemObject):
+            fields = []
+            for prop, val in el.items:
+                r = self.parse(val)
+                if r is not None:
+                    fields.append((r[0], _ident(prop), r[1]))
+            base = _ident(el.class_name) if el.class_name else "OBJECT"
+            return self._define(("O", el.class_name, tuple(fields)), base, fields), 1
+
+        if isinstance(el, DataItem):
+            return self._leaf(el)
+
+        return None
+
+    def generate(self, root: StructItem) -> str:
+        root_type, n = self.parse(root) or ("u8", 0)
+        suffix = f"[{n}]" if n > 1 else ""
+        return "\n\n".join(self.parts + [f"{root_type} root{suffix} @ 0x{root.pos:02X};"])
+
+
+def structure_to_imhex(root: StructItem) -> str:
+    """Generates imHex pattern language source for a structure tree."""
+    return ImHexGenerator().generate(root)
+
+
+KAITAI_TYPES = {
+    "b": "s1", "h": "s2", "i": "s4", "l": "s4", "q": "s8", "n": "s8",
+    "B": "u1", "H": "u2", "I": "u4", "L": "u4", "Q": "u8", "N": "u8", "P": "u8",
+    "?": "u1", "f": "f4", "d": "f8",
+}
+KAITAI_ENDIAN = {">": "be", "!": "be", "<": "le"}
+# native formats ("@", "=", no prefix) were recorded on this machine
+KAITAI_NATIVE_ENDIAN = "le" if sys.byteorder == "little" else "be"
+
+# (("type", name) or ("size", n), repeat count or None)
+KaitaiField = Tuple[Tuple[str, object], Optional[int]]
+# (id, absolute pos, field) - items outside the sequential layout
+KaitaiInstance = Tuple[str, int, KaitaiField]
+
+
+def _ksy_ident(name) -> str:
+    """Kaitai identifiers are lower_snake_case and start with a letter."""
+    result = re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", str(name))
+    result = re.sub(r"[^a-z0-9_]", "_", result.lower())
+    if not result or not result[0].isalpha():
+        result = "f_" + result
+    return result
+
+
+def _unique_ident(name, used: Set[str]) -> str:
+    """Kaitai id of `name`, suffixed (_2, _3, ...) if already used in the same type."""
+    base = _ksy_ident(name)
+    ident = base
+    n = 1
+    while ident in used:
+        n += 1
+        ident = f"{base}_{n}"
+    used.add(ident)
+    return ident
+
+
+class KaitaiWriter:
+    """
+    Streams a Kaitai Struct (.ksy) definition into a text file object.
+    Types are written as soon as they are first seen (post-order), the top-level
+    seq is written last; YAML key order does not matter, so nothing is buffered
+    besides the table of already defined types.
+    Fields that follow each other go into `seq` (gaps become size-only padding),
+    fields read out of order (goto back, follow() targets) become `instances` with `pos`.
+    """
+    def __init__(self, out, ksy_id: str = "bytewirez_trace"):
+        self.out = out
+        self.ksy_id = _ksy_ident(ksy_id)
+        self._types: Dict[tuple, str] = {}
+        self._used_names: Set[str] = set()
+        self._counter = IncrementalNameGenerator(item_format="{name}_{count}")
+        self._types_started = False
+
+    def _new_name(self, base: str) -> str:
+        name = base
+        if name in self._used_names or base in ("object", "array", "format"):
+            name = self._counter.next(base)
+        self._used_names.add(name)
+        return name
+
+    def _write_field(self, kind: str, value, repeat: Optional[int], indent: str):
+        self.out.write(f"{indent}{kind}: {value}\n")
+        if repeat is not None:
+            self.out.write(f"{indent}repeat: expr\n")
+            self.out.write(f"{indent}repeat-expr: {repeat}\n")
+
+    def _write_seq(self, fields: List[Tuple[str, KaitaiField]], indent: str, instances: Tuple[KaitaiInstance, ...] = ()):
+        if not fields:
+            self.out.write(f"{indent}seq: []\n")
+        else:
+            self.out.write(f"{indent}seq:\n")
+            for name, ((kind, value), repeat) in fields:
+                self.out.write(f"{indent}  - id: {name}\n")
+                self._write_field(kind, value, repeat, indent + "    ")
+        if instances:
+            self.out.write(f"{indent}instances:\n")
+            for name, pos, ((kind, value), repeat) in instances:
+                self.out.write(f"{indent}  {name}:\n")
+                self.out.write(f"{indent}    pos: 0x{pos:X}\n")
+                self._write_field(kind, value, repeat, indent + "    ")
+
+    def _define(
+        self, sig: tuple, base: str, fields: List[Tuple[str, KaitaiField]], instances: Tuple[KaitaiInstance, ...] = ()
+    ) -> str:
+        name = self._types.get(sig)
+        if name is None:
+            name = self._new_name(base)
+            self._types[sig] = name
+            if not self._types_started:
+                self.out.write("types:\n")
+                self._types_started = True
+            self.out.write(f"  {name}:\n")
+            self._write_seq(fields, "    ", instances)
+        return name
+
+    @staticmethod
+    def _scalar(endian: str, code: str, n: int) -> KaitaiField:
+        type_name = KAITAI_TYPES.get(code)
+        if type_name is None:
+            # strings, chars, padding, half floats: raw bytes
+            size = n if code in "spx" else n * (2 if code == "e" else 1)
+            return ("size", size), None
+        if endian in ("", "@") and code not in "fd":
+            # native sizes (e.g. "l" is 8 bytes on most 64-bit systems)
+            type_name = type_name[0] + str(struct.calcsize("@" + code))
+        if type_name[1:] != "1":
+            type_name += KAITAI_ENDIAN.get(endian, KAITAI_NATIVE_ENDIAN)
+        return ("type", type_name), (n if n > 1 else None)
+
+    def _leaf(self, el: DataItem) -> KaitaiField:
+        if not el.fmt:
+            return ("size", el.size), None
+        endian, parts = split_fmt(el.fmt)
+        if not parts:
+            return ("size", el.size), None
+        if len(parts) == 1:
+            n, code = parts[0]
+            return self._scalar(endian, code, n)
+        if endian in ("", "@"):
+            # native alignment: padding between the values
+            fields = []
+            at = 0
+            for i, (offset, field) in enumerate(fmt_fields(el.fmt)[1]):
+                if offset > at:
+                    fields.append((f"pad_{i}", (("size", offset - at), None)))
+                n, code = split_fmt(field)[1][0]
+                fields.append((f"v{i}", self._scalar(endian, code, n)))
+                at = offset + struct.calcsize("@" + field)
+        else:
+            fields = [(f"v{i}", self._scalar(endian, code, n)) for i, (n, code) in enumerate(parts)]
+        return ("type", self._define(("F", el.fmt), "format", fields)), None
+
+    def _layout(self, start: int, children) -> Tuple[List[Tuple[str, KaitaiField]], Tuple[KaitaiInstance, ...], int]:
+        """Splits (name, item) children into seq fields (with gap padding) and instances."""
+        parsed = []
+        for name, item in children:
+            r = self._parse(item)
+            if r is not None:
+                parsed.append((name, item.pos, r[0], r[1]))
+        # next_lower[i]: first later field starting before field i (a jump back)
+        next_lower: List[Optional[int]] = [None] * len(parsed)
+        stack: List[int] = []
+        for i, (_, pos, _, _) in enumerate(parsed):
+            while stack and parsed[stack[-1]][1] > pos:
+                next_lower[stack.pop()] = i
+            stack.append(i)
+
+        used: Set[str] = set()
+        fields: List[Tuple[str, KaitaiField]] = []
+        instances: List[KaitaiInstance] = []
+        cursor = start
+        excursion_end = -1
+        for i, (name, pos, field, end) in enumerate(parsed):
+            ident = _unique_ident(name, used)
+            if pos > cursor and i >= excursion_end:
+                back = next_lower[i]
+                if back is not None and parsed[back][1] >= cursor:
+                    # read ahead and came back (follow() target): out of the sequence
+                    excursion_end = back
+            if i < excursion_end or pos < cursor:
+                instances.append((ident, pos, field))
+                continue
+            if pos > cursor:
+                fields.append((_unique_ident("gap", used), (("size", pos - cursor), None)))
+            fields.append((ident, field))
+            cursor = end
+        return fields, tuple(instances), cursor
+
+    def _parse(self, el: StructItem) -> Optional[Tuple[KaitaiField, int]]:
+        """(field description, end of the sequentially read data) of an element."""
+        if isinstance(el, StructItemList):
+            results = [(item, self._parse(item)) for item in el.items]
+            results = [(item, r) for item, r in results if r is not None]
+            if not results:
+                return None
+            first = results[0][1][0]
+            contiguous = all(item.pos == prev[1] for (item, _), (_, prev) in zip(results[1:], results))
+            if first[1] is None and contiguous and all(r[0] == first for _, r in results):
+                return (first[0], len(results)), results[-1][1][1]
+            fields, instances, end = self._layout(el.pos, ((f"item_{i}", item) for i, (item, _) in enumerate(results)))
+            name = self._define(("L", tuple(fields), instances), "array", fields, instances)
+            return (("type", name), None), end
+
+        if isinstance(el, StructItemObject):
+            fields, instances, end = self._layout(el.pos, el.items)
+            base = _ksy_ident(el.class_name) if el.class_name else "object"
+            sig = ("O", el.class_name, tuple(fields), instances)
+            return (("type", self._define(sig, base, fields, instances)), None), end
+
+        if isinstance(el, DataItem):
+            return self._leaf(el), el.pos + el.size
+
+        return None
+
+    def parse(self, el: StructItem) -> Optional[KaitaiField]:
+        """Returns the field description of an element, writing types as needed."""
+        r = self._parse(el)
+        return None if r is None else r[0]
+
+    def write(self, root: StructItem):
+        self.out.write("meta:\n")
+        self.out.write(f"  id: {self.ksy_id}\n")
+        if isinstance(root, StructItemObject):
+            fields, instances, _ = self._layout(0, root.items)
+        else:
+            fields, instances, _ = self._layout(0, [("root", root)])
+        self._write_seq(fields, "", instances)
+
+
+def structure_to_kaitai(root: StructItem, into_file=None, ksy_id: str = "bytewirez_trace") -> Optional[str]:
+    """
+    Generates a Kaitai Struct (.ksy) definition for a structure tree.
+    Writes into `into_file` if given, otherwise returns the text.
+    """
+    if into_file is not None:
+        KaitaiWriter(into_file, ksy_id).write(root)
+        return None
+    import io
+    out = io.StringIO()
+    KaitaiWriter(out, ksy_id).write(root)
+    return out.getvalue()
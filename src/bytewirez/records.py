@@ -0,0 +1,184 @@
+"""
+Lazily decoded fixed-size records.
+
+A record object holds only a buffer reference and a base offset. Each field is decoded
+with struct.unpack_from the first time it is accessed and cached in a slot, so records
+where only a field or two is ever touched cost almost nothing. A RecordList computes
+record offsets, so indexing is O(1) and nothing is decoded up front.
+"""
+import struct
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .bytewirez import ENDIAN_BIG, fmt_fields
+
+
+def _make_getter(name: str, unpack_from, offset: int, cache) -> property:
+    """Property decoding one field on first access and caching it in its slot."""
+    cache_get = cache.__get__
+    cache_set = cache.__set__
+
+    def _get(self):
+        try:
+            return cache_get(self)
+        except AttributeError:
+            value = unpack_from(self._buf, self._base + offset)[0]
+            cache_set(self, value)
+            return value
+    _get.__name__ = name
+    return property(_get)
+
+
+class Record:
+    """Base class of generated record types."""
+    __slots__ = ("_buf", "_base")
+    _layout: 'RecordLayout'
+
+    def __init__(self, buf, base: int = 0):
+        self._buf = buf
+        self._base = base
+
+    @property
+    def offset(self) -> int:
+        return self._base
+
+    def raw(self) -> bytes:
+        return bytes(self._buf[self._base:self._base + self._layout.size])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self._layout.names}
+
+    def __json__(self) -> Dict[str, Any]:
+        return self.to_dict()
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Record):
+            return NotImplemented
+        return self._layout is other._layout and self.raw() == other.raw()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._layout.names)
+        return f"{type(self).__name__}({fields})"
+
+
+class RecordLayout:
+    """
+    Field layout of a fixed-size record: (name, fmt, offset) triples.
+    Field formats may carry their own endian prefix, `endian` is used otherwise.
+    """
+    def __init__(
+        self,
+        fields: Sequence[Tuple[str, str, int]],
+        size: Optional[int] = None,
+        endian: str = ENDIAN_BIG,
+        class_name: str = "Record"
+    ):
+        self.fields: List[Tuple[str, str, int]] = []
+        end = 0
+        for name, fmt, offset in fields:
+            if not fmt or fmt[0] not in "@=<>!":
+                fmt = endian + fmt
+            self.fields.append((name, fmt, offset))
+            end = max(end, offset + struct.calcsize(fmt))
+        if size is None:
+            size = end
+        elif size < end:
+            raise ValueError(f"Record size {size} is smaller than its fields ({end})")
+        self.size = size
+        self.names = [name for name, _, _ in self.fields]
+        self.record_class = self._make_class(class_name)
+
+    @classmethod
+    def from_fmt(cls, fmt: str, into: Optional[List[str]] = None, class_name: str = "Record") -> 'RecordLayout':
+        """
+        Layout of a struct format string; values are named by `into` like in unpack_ex
+        (unnamed values are called field_N, None in `into` skips a value). As in struct,
+        a format without a byte order prefix is native (sizes, alignment and byte order).
+        """
+        return _layout_from_fmt(fmt, tuple(into) if into else (), class_name)
+
+    def _make_class(self, class_name: str) -> type:
+        names = self.names
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate field names in record layout: {names}")
+        clashes = [name for name in names if hasattr(Record, name)]
+        if clashes:
+            raise ValueError(f"Field names clash with Record attributes: {clashes}")
+        # the cache slots are created first, the properties wrap them
+        cls = type(class_name, (Record, ), {"__slots__": tuple("_c_" + name for name in names)})
+        for name, fmt, offset in self.fields:
+            setattr(cls, name, _make_getter(name, struct.Struct(fmt).unpack_from, offset, cls.__dict__["_c_" + name]))
+        cls._layout = self
+        return cls
+
+    def record(self, buf, base: int = 0) -> Record:
+        """A lazy record at `base` in `buf`."""
+        return self.record_class(buf, base)
+
+    def __repr__(self) -> str:
+        return f"RecordLayout(size={self.size}, fields={self.fields!r})"
+
+
+@lru_cache(maxsize=256)
+def _layout_from_fmt(fmt: str, into: Tuple[Optional[str], ...], class_name: str) -> RecordLayout:
+    endian, fields = fmt_fields(fmt)
+    if len(into) > len(fields):
+        raise struct.error(f"RecordLayout: more names ({len(into)}) than values ({len(fields)})")
+    # no prefix means native, like in struct: the offsets are aligned, so decode natively too
+    endian = endian or "@"
+    named = []
+    for i, (offset, field) in enumerate(fields):
+        name = into[i] if i < len(into) else f"field_{i}"
+        if name is not None:
+            named.append((name, endian + field, offset))
+    return RecordLayout(named, size=struct.calcsize(fmt), endian=endian, class_name=class_name)
+
+
+class RecordList(Sequence):
+    """
+    `count` consecutive records in a buffer. Indexing creates one lazy record object,
+    slicing returns another RecordList over the same buffer.
+    """
+    def __init__(self, layout: RecordLayout, buf, base: int = 0, count: Optional[int] = None, stride: Optional[int] = None):
+        self.layout = layout
+        self.stride = stride or layout.size
+        if count is None:
+            avail = len(buf) - base
+            count = (avail - layout.size) // self.stride + 1 if avail >= layout.size else 0
+        self._buf = buf
+        self._base = base
+        self._count = count
+        self._make = layout.record_class
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, idx: Union[int, slice]):
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(self._count)
+            if step < 0:
+                return [self[i] for i in range(start, stop, step)]
+            n = len(range(start, stop, step))
+            return RecordList(self.layout, self._buf, self._base + start * self.stride, n, self.stride * step)
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError("record index out of range")
+        return self._make(self._buf, self._base + idx * self.stride)
+
+    def __iter__(self) -> Iterator[Record]:
+        make, buf, stride = self._make, self._buf, self.stride
+        for i in range(self._count):
+            yield make(buf, self._base + i * stride)
+
+    def column(self, name: str) -> List[Any]:
+        """All values of one field (decoded eagerly, without creating record objects)."""
+        for field_name, fmt, offset in self.layout.fields:
+            if field_name == name:
+                unpack_from = struct.Struct(fmt).unpack_from
+                buf, base, stride = self._buf, self._base + offset, self.stride
+                return [unpack_from(buf, base + i * stride)[0] for i in range(self._count)]
+        raise KeyError(name)
+
+    def __repr__(self) -> str:
+        return f"RecordList({self.layout.record_class.__name__} x {self._count})"
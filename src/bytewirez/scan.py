@@ -0,0 +1,172 @@
+"""
+Signature / pattern scanning over data read in large chunks.
+
+Patterns can be:
+  bytes         - literal, found with bytes.find
+  str           - hex signature with wildcards, e.g. "4D 5A ?? ?? 50 45"
+  re.Pattern    - compiled bytes regex (matches may not be longer than `overlap`)
+Many literal patterns at once are handled by an Aho-Corasick automaton (MultiPatternScanner)
+that keeps its state between chunks, so no overlap is needed there.
+"""
+import re
+from collections import deque
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
+
+Pattern = Union[bytes, str, "re.Pattern"]
+ReadAt = Callable[[int, int], bytes]
+
+DEFAULT_CHUNK = 1 << 20
+DEFAULT_REGEX_OVERLAP = 4096
+
+
+def compile_hex_pattern(sig: str) -> Tuple["re.Pattern", int]:
+    """Compiles "DE AD ?? EF" into a regex reporting overlapping matches; returns (regex, length)."""
+    tokens = sig.split() if " " in sig.strip() else [sig[i:i + 2] for i in range(0, len(sig), 2)]
+    parts = []
+    length = 0
+    for tok in tokens:
+        if tok in ("??", "?"):
+            parts.append(b".")
+            length += 1
+        else:
+            # a token may hold several bytes ("4D5A ??")
+            raw = bytes.fromhex(tok)
+            parts.append(re.escape(raw))
+            length += len(raw)
+    # lookahead: zero-width, so overlapping occurrences are all reported
+    return re.compile(b"(?=" + b"".join(parts) + b")", re.DOTALL), length
+
+
+def _chunks(read_at: ReadAt, start: int, end: Optional[int], chunk_size: int, overlap: int) -> Iterator[Tuple[int, bytes, int]]:
+    """Yields (base offset, data, own length); data includes `overlap` bytes of the next chunk."""
+    pos = start
+    while end is None or pos < end:
+        want = chunk_size if end is None else min(chunk_size, end - pos)
+        data = read_at(pos, want + overlap if end is None else min(want + overlap, end - pos))
+        if not data:
+            return
+        yield pos, data, min(want, len(data))
+        if len(data) < want:
+            return
+        pos += want
+
+
+def find_all(
+    read_at: ReadAt,
+    pattern: Pattern,
+    start: int = 0,
+    end: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK,
+    overlap: Optional[int] = None
+) -> Iterator[int]:
+    """Yields offsets of all matches of `pattern` in [start, end)."""
+    if isinstance(pattern, (bytes, bytearray)):
+        pattern = bytes(pattern)
+        if not pattern:
+            raise ValueError("find_all: empty pattern")
+        n = len(pattern)
+        for base, data, own in _chunks(read_at, start, end, chunk_size, n - 1):
+            i = data.find(pattern)
+            while 0 <= i < own:
+                yield base + i
+                i = data.find(pattern, i + 1)
+        return
+
+    if isinstance(pattern, str):
+        regex, n = compile_hex_pattern(pattern)
+        overlap = n - 1
+    else:
+        regex = pattern
+        overlap = DEFAULT_REGEX_OVERLAP if overlap is None else overlap
+
+    # a match running into the overlap is seen again (as a suffix) in the next chunk
+    last_end = start
+    for base, data, own in _chunks(read_at, start, end, chunk_size, overlap):
+        for m in regex.finditer(data):
+            if m.start() >= own:
+                break
+            if base + m.start() < last_end:
+                continue
+            yield base + m.start()
+            last_end = base + m.end()
+
+
+class MultiPatternScanner:
+    """
+    Aho-Corasick automaton over literal byte patterns.
+    Feed data in any chunks; matches are reported as (start offset, key).
+    """
+    def __init__(self, patterns: Union[Dict[Hashable, bytes], Iterable[bytes]]):
+        if not isinstance(patterns, dict):
+            patterns = dict(enumerate(patterns))
+        self._goto: List[Dict[int, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[Hashable, int]]] = [[]]
+        for key, pat in patterns.items():
+            if not pat:
+                raise ValueError(f"MultiPatternScanner: empty pattern for {key!r}")
+            state = 0
+            for b in pat:
+                nxt = self._goto[state].get(b)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][b] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((key, len(pat)))
+        self._build_failures()
+        first = bytes(sorted(self._goto[0]))
+        self._first_re = re.compile(b"[" + b"".join(re.escape(bytes([c])) for c in first) + b"]") if first else None
+        self.reset()
+
+    def _build_failures(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for b, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and b not in self._goto[f]:
+                    f = self._fail[f]
+                f = self._goto[f].get(b, 0)
+                self._fail[nxt] = f if f != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def reset(self, offset: int = 0):
+        """Restarts matching; `offset` is the absolute position of the next fed byte."""
+        self._state = 0
+        self._offset = offset
+
+    def feed(self, data: bytes) -> Iterator[Tuple[int, Hashable]]:
+        """Feeds the next chunk of data, yields (start offset, key) for every match ending in it."""
+        goto, fail, out = self._goto, self._fail, self._out
+        first_re = self._first_re
+        state = self._state
+        base = self._offset
+        i = 0
+        n = len(data)
+        while i < n:
+            if state == 0:
+                # skip straight to the next byte that can start a pattern
+                m = first_re.search(data, i) if first_re is not None else None
+                if m is None:
+                    break
+                i = m.start()
+            b = data[i]
+            while state and b not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(b, 0)
+            if out[state]:
+                for key, length in out[state]:
+                    yield base + i - length + 1, key
+            i += 1
+        self._state = state
+        self._offset = base + n
+
+    def scan(self, read_at: ReadAt, start: int = 0, end: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK) -> Iterator[Tuple[int, Hashable]]:
+        """Scans [start, end) read through `read_at(offset, size)`."""
+        self.reset(start)
+        for _, data, _ in _chunks(read_at, start, end, chunk_size, 0):
+            yield from self.feed(data)
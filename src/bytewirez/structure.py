@@ -0,0 +1,288 @@
+"""
+Structure tracking: StructureReader hooks into a Wire and records everything read
+as a tree of StructItem objects (used by the viewer and the exporters).
+"""
+import logging
+import struct
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .bytewirez import Wire
+
+logger = logging.getLogger(__name__)
+
+
+
+@dataclass
+class StructItem:
+    """Base class for all structural items."""
+    pos: int = 0
+    size: int = 0
+    kind: str = "ABSTRACT"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "TYPE": self.kind,
+            "POS": self.pos,
+            "SIZE": self.size,
+        }
+
+    def __json__(self) -> Dict[str, Any]:
+        return self.to_dict()
+
+@dataclass
+class DataItem(StructItem):
+    """Represents a leaf node containing raw data."""
+    raw: bytes = b""
+    fmt: Optional[str] = None
+    kind: str = "DATA"
+
+    def to_dict(self, with_hex: bool = True) -> Dict[str, Any]:
+        result = super().to_dict()
+        if self.fmt:
+            result["format"] = self.fmt
+            try:
+                unpacked = struct.unpack(self.fmt, self.raw)
+                result["data_fmt"] = unpacked[0] if len(unpacked) == 1 else unpacked
+            except (struct.error, TypeError):
+                logger.warning("Failed to unpack data at %s with format %s", self.pos, self.fmt)
+        
+        if with_hex:
+            result["data_hex"] = self.raw.hex()
+        return result
+
+@dataclass
+class StructItemObject(StructItem):
+    """Represents a collection of named fields."""
+    items: List[Tuple[str, StructItem]] = field(default_factory=list)
+    class_name: Optional[str] = None
+    kind: str = "OBJECT"
+
+    def add(self, name: str, item: StructItem):
+        self.size += item.size
+        self.items.append((name, item))
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = super().to_dict()
+        if self.class_name:
+            result["CLASS"] = self.class_name
+        result['FIELDS'] = self.items
+        return result
+
+
+
+@dataclass
+class StructItemList(StructItem):
+    """Represents a collection of ordered items."""
+    items: List[StructItem] = field(default_factory=list)
+    kind: str = "LIST"
+
+    def add(self, item: StructItem):
+        self.size += item.size
+        self.items.append(item)
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = super().to_dict()
+        result["ITEMS"] = self.items
+        return result
+
+
+
+
+
+@dataclass
+class RefItem(StructItem):
+    """Represents a reference to an already decoded target (see Wire.follow)."""
+    target: int = 0
+    target_size: int = 0
+    kind: str = "REF"
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = super().to_dict()
+        result["TARGET"] = self.target
+        result["TARGET_SIZE"] = self.target_size
+        return result
+
+
+class MagicStructReaderContextManager:
+  """
+  Used to provide context-manager for StructureReader
+  """
+  def __init__(self, parent, obj, comment=""):
+    self.parent = parent
+    self.obj = obj
+    self.comment = type(obj).__name__
+    if comment != "" :
+      self.comment + " // " + comment
+
+  def __enter__(self):
+    logger.debug(" >>>> %s", self.comment)
+    self.parent._struct_depth += 1
+
+  def __exit__(self, *a, **kw):
+    self.parent._struct_depth -= 1
+    logger.debug(" <<<< %s", self.comment)
+    self.parent.end_item(*a, **kw)
+
+
+class MagicProxyObject:
+  _parent = None
+
+  def __init__(self, parent):
+    self._parent = parent
+
+  def __getattr__(self, __name: str):
+    if __name.startswith("start_"):
+      return getattr(self._parent,__name)
+    return getattr(self._parent._wire,__name)
+
+class StructureReader:
+    """
+    Tracks the structure of binary data as it is being read from a Wire.
+    """
+    def __init__(self, wire: Wire, sink=None):
+        """
+        With `sink`, finished top-level items are passed to `sink(name, item)` and dropped
+        instead of being kept in the tree (and read data is not collected), so memory stays
+        bounded when reading endless streams.
+        """
+        self._wire = wire
+        self._sink = sink
+        self._item_stack: List[StructItem] = []
+        self._names_stack: List[str] = []
+        self._struct_depth = 0
+        self._last_format: Optional[str] = None
+        self._current_item: Optional[DataItem] = None
+        self._data = bytearray()
+        # stays True while the collected data matches the stream offsets (no gaps, no goto back)
+        self._contiguous = True
+        # top-level items already handed to the sink (keeps default names running)
+        self._flushed = 0
+        
+        # Start with a root object
+        root = StructItemObject(pos=self._wire.get_pos())
+        self._item_stack.append(root)
+
+        wire.install_hook(wire.read, pre=self._hook_pre_read, post=self._hook_post_read)
+        wire.install_hook(wire.read_fmt, pre=self._hook_pre_fmt_read, post=self._hook_post_fmt_read)
+        wire.install_hook(wire._follow_hit, pre=self._hook_follow_hit)
+
+    def _hook_pre_read(self, size: int, *args, **kwargs):
+        logger.debug("HOOK PRE-READ %s", size)
+        self._current_item = DataItem(pos=self._wire.get_pos(), size=size, fmt=self._last_format)
+        self._last_format = None
+        return None
+
+    def _hook_post_read(self, result: bytes):
+        if self._current_item is None:
+            logger.error("current_item is None in post-read hook")
+            return result
+            
+        logger.debug("HOOK POST-READ %s bytes", len(result))
+        item = self._current_item
+        item.raw = result
+        self._append_to_current(item)
+        self._current_item = None
+        if self._sink is None:
+            if item.pos != len(self._data):
+                self._contiguous = False
+            self._data.extend(result)
+        else:
+            self._flush_finished()
+        return result
+
+    def _hook_pre_fmt_read(self, fmt: str, *args, **kwargs):
+        logger.debug("HOOK PRE-FMT-READ %s", fmt)
+        self._last_format = self._wire.fix_endian(fmt)
+        return None
+
+    def _hook_post_fmt_read(self, result):
+        logger.debug("HOOK POST-FMT-READ %s", result)
+        return result
+
+    def _hook_follow_hit(self, offset: int, size: int):
+        logger.debug("HOOK FOLLOW-HIT %#x", offset)
+        self._append_to_current(RefItem(pos=self._wire.get_pos(), target=offset, target_size=size))
+        self._flush_finished()
+        return None
+
+    def will_read(self, *names: str) -> MagicProxyObject:
+        """Queues names for the next items to be read."""
+        for name in reversed(names):
+            self._names_stack.append(name)
+        return MagicProxyObject(self)
+
+    def start_object(self, class_name: str = "", comment: str = "") -> MagicStructReaderContextManager:
+        """Starts a new nested object context."""
+        obj = StructItemObject(class_name=class_name, pos=self._wire.get_pos())
+        self._push_item(obj)
+        return MagicStructReaderContextManager(self, obj, comment)
+
+    def start_list(self, comment: str = "") -> MagicStructReaderContextManager:
+        """Starts a new nested list context."""
+        obj = StructItemList(pos=self._wire.get_pos())
+        self._push_item(obj)
+        return MagicStructReaderContextManager(self, obj, comment)
+
+    def _append_to_current(self, o: StructItem):
+        top = self.last_item()
+        if isinstance(top, StructItemObject):
+            if self._names_stack:
+                name = self._names_stack.pop()
+            else:
+                count = len(top.items) + (self._flushed if top is self._item_stack[0] else 0)
+                name = f"item_{count:05}"
+            top.add(name, o)
+        elif isinstance(top, StructItemList):
+            top.add(o)
+        else:
+            raise TypeError(f"Cannot append to item of type {type(top)}")
+
+    def _push_item(self, o: StructItem):
+        self._append_to_current(o)
+        self._item_stack.append(o)
+
+    def _flush_finished(self):
+        """In sink mode, hands the finished top-level items to the sink and drops them."""
+        if self._sink is None or len(self._item_stack) != 1:
+            return
+        root = self._item_stack[0]
+        for name, item in root.items:
+            self._sink(name, item)
+        self._flushed += len(root.items)
+        root.items.clear()
+
+    def last_item(self) -> StructItem:
+        return self._item_stack[-1]
+
+    def end_item(self, exc_type, exc_val, exc_tb):
+        """Ends the current structural context."""
+        top = self._item_stack.pop()
+        self.last_item().size += top.size
+        self._flush_finished()
+        
+        if exc_type:
+            import traceback
+            logger.error("Error ending item at depth %s", len(self._item_stack))
+            logger.error("Exception: %s: %s", exc_type.__name__, exc_val)
+            # traceback.print_tb(exc_tb)
+
+    def get_root_element(self) -> StructItem:
+        return self._item_stack[0]
+
+    def get_data(self) -> bytes:
+        return bytes(self._data)
+
+
+
+
+
+    def output_imHex(self) -> str:
+        """Generates imHex pattern language representation."""
+        from .patterns import structure_to_imhex
+        return structure_to_imhex(self.get_root_element())
+
+    def output_kaitai(self, into_file=None, ksy_id: str = "bytewirez_trace") -> Optional[str]:
+        """Generates a Kaitai Struct (.ksy) definition (written into `into_file` if given)."""
+        from .patterns import structure_to_kaitai
+        return structure_to_kaitai(self.get_root_element(), into_file=into_file, ksy_id=ksy_id)
@@ -0,0 +1,521 @@
+"""
+Compact binary trace format for StructureReader trees.
+
+Layout (all integers are LEB128 varints unless noted):
+  magic "BWZT", version (u8)
+  nodes in pre-order:
+    tag (u8): 0=DATA 1=OBJECT 2=LIST 3=REF
+    pos (zigzag delta from the previous node's pos), size
+    DATA:   fmt string ref
+    OBJECT: class string ref, child count, then per child: name string ref + node
+    LIST:   child count, then child nodes
+    REF:    target offset, target size
+
+String refs: 0 is "none", otherwise an index into the string table. A string is
+defined on first use: when the ref equals the table size it is followed by
+its utf-8 length and bytes. Raw data is not stored; DATA nodes point into the
+original data by pos/size.
+
+load_trace() decodes lazily (LazyTrace): opening only checks the header, containers
+decode their children when first accessed. parse_trace() decodes everything at once.
+"""
+import mmap
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from .bytewirez import Wire, decode_varint, encode_varint
+from .export import custom_json_serializer, structure_to_html_viewer, structure_to_yaml
+from .structure import DataItem, RefItem, StructItem, StructItemList, StructItemObject
+
+
+TRACE_MAGIC = b"BWZT"
+TRACE_VERSION = 1
+
+TAG_DATA = 0
+TAG_OBJECT = 1
+TAG_LIST = 2
+TAG_REF = 3
+
+
+def _zigzag(v: int) -> int:
+    return (v << 1) if v >= 0 else ((-v << 1) - 1)
+
+
+def _unzigzag(v: int) -> int:
+    return (v >> 1) if not v & 1 else -((v + 1) >> 1)
+
+
+class TraceWriter:
+    """
+    Streams a structure tree into the binary trace format through a Wire.
+    Encoded nodes are collected in a small buffer and flushed every `flush_size` bytes.
+    """
+    def __init__(self, out: BinaryIO, flush_size: int = 1 << 20):
+        self._wire = Wire.from_fd(out)
+        self._buf = bytearray()
+        # string -> encoded reference
+        self._refs: Dict[Optional[str], bytes] = {None: b"\x00", "": b"\x00"}
+        self.flush_size = flush_size
+
+    def _string(self, s: Optional[str]):
+        ref = self._refs.get(s)
+        if ref is not None:
+            self._buf += ref
+            return
+        ref = self._refs[s] = encode_varint(len(self._refs) - 1)
+        raw = s.encode("utf-8")
+        self._buf += ref
+        self._buf += encode_varint(len(raw))
+        self._buf += raw
+
+    def _flush(self):
+        if self._buf:
+            self._wire.write(bytes(self._buf))
+            self._buf.clear()
+
+    def write(self, root: StructItem):
+        self._wire.write(TRACE_MAGIC)
+        self._wire.write_byte(TRACE_VERSION)
+
+        buf = self._buf
+        refs = self._refs
+        last_pos = 0
+        # (field name, item, write the name?) - names are written only for children of objects
+        stack: List[Tuple[Optional[str], StructItem, bool]] = [(None, root, False)]
+        while stack:
+            name, item, named = stack.pop()
+            if named:
+                ref = refs.get(name)
+                if ref is None:
+                    self._string(name)
+                else:
+                    buf += ref
+
+            if isinstance(item, DataItem):
+                buf.append(TAG_DATA)
+            elif isinstance(item, StructItemObject):
+                buf.append(TAG_OBJECT)
+            elif isinstance(item, StructItemList):
+                buf.append(TAG_LIST)
+            elif isinstance(item, RefItem):
+                buf.append(TAG_REF)
+            else:
+                raise TypeError(f"Cannot write item of type {type(item)} to trace")
+
+            v = _zigzag(item.pos - last_pos)
+            last_pos = item.pos
+            if v < 0x80:
+                buf.append(v)
+            else:
+                buf += encode_varint(v)
+            v = item.size
+            if v < 0x80:
+                buf.append(v)
+            else:
+                buf += encode_varint(v)
+
+            if isinstance(item, DataItem):
+                ref = refs.get(item.fmt)
+                if ref is None:
+                    self._string(item.fmt)
+                else:
+                    buf += ref
+            elif isinstance(item, StructItemObject):
+                self._string(item.class_name)
+                buf += encode_varint(len(item.items))
+                stack.extend((sub_name, sub, True) for sub_name, sub in reversed(item.items))
+            elif isinstance(item, RefItem):
+                buf += encode_varint(item.target)
+                buf += encode_varint(item.target_size)
+            else:
+                buf += encode_varint(len(item.items))
+                stack.extend((None, sub, False) for sub in reversed(item.items))
+
+            if len(buf) >= self.flush_size:
+                self._flush()
+        self._flush()
+
+
+def _read_string(buf, pos: int, strings: List[Optional[str]]) -> Tuple[Optional[str], int]:
+    ref, pos = decode_varint(buf, pos)
+    if ref == len(strings):
+        n, pos = decode_varint(buf, pos)
+        strings.append(str(buf[pos:pos + n], "utf-8"))
+        pos += n
+    return strings[ref], pos
+
+
+def parse_trace(buf, data=None) -> StructItem:
+    """
+    Decodes a trace from a buffer (bytes, memoryview, mmap).
+    DATA items get their raw bytes sliced from `data` when it is given.
+    """
+    if bytes(buf[:4]) != TRACE_MAGIC:
+        raise ValueError("Not a bytewirez trace (bad magic)")
+    if buf[4] != TRACE_VERSION:
+        raise ValueError(f"Unsupported trace version {buf[4]}")
+
+    strings: List[Optional[str]] = [None]
+    n_strings = 1
+    pos = 5
+    last_pos = 0
+    root = None
+    # (container, children left, is object)
+    stack: List[List] = []
+    parent = None
+    while True:
+        name = None
+        if parent is not None and parent[2]:
+            ref = buf[pos]
+            if ref < 0x80 and ref < n_strings:
+                name = strings[ref]
+                pos += 1
+            else:
+                name, pos = _read_string(buf, pos, strings)
+                n_strings = len(strings)
+
+        tag = buf[pos]
+        v = buf[pos + 1]
+        if v < 0x80:
+            pos += 2
+        else:
+            v, pos = decode_varint(buf, pos + 1)
+        last_pos += _unzigzag(v)
+        size = buf[pos]
+        if size < 0x80:
+            pos += 1
+        else:
+            size, pos = decode_varint(buf, pos)
+
+        children = 0
+        if tag == TAG_DATA:
+            ref = buf[pos]
+            if ref < 0x80 and ref < n_strings:
+                fmt = strings[ref]
+                pos += 1
+            else:
+                fmt, pos = _read_string(buf, pos, strings)
+                n_strings = len(strings)
+            raw = bytes(data[last_pos:last_pos + size]) if data is not None else b""
+            item = DataItem(pos=last_pos, size=size, raw=raw, fmt=fmt)
+        elif tag == TAG_OBJECT:
+            class_name, pos = _read_string(buf, pos, strings)
+            n_strings = len(strings)
+            children, pos = decode_varint(buf, pos)
+            item = StructItemObject(pos=last_pos, size=size, class_name=class_name)
+        elif tag == TAG_LIST:
+            children, pos = decode_varint(buf, pos)
+            item = StructItemList(pos=last_pos, size=size)
+        elif tag == TAG_REF:
+            target, pos = decode_varint(buf, pos)
+            target_size, pos = decode_varint(buf, pos)
+            item = RefItem(pos=last_pos, size=size, target=target, target_size=target_size)
+        else:
+            raise ValueError(f"Unknown trace tag {tag} at {pos}")
+
+        if parent is not None:
+            if parent[2]:
+                parent[0].items.append((name or "", item))
+            else:
+                parent[0].items.append(item)
+            parent[1] -= 1
+        else:
+            root = item
+
+        if children:
+            stack.append([item, children, tag == TAG_OBJECT])
+        while stack and stack[-1][1] == 0:
+            stack.pop()
+        if not stack:
+            return root
+        parent = stack[-1]
+
+
+class _LazyItems:
+    """Children of a container node of a LazyTrace, decoded on first access of `items`."""
+    _named = False
+
+    def __init__(self, reader: 'TraceReader', body: int, count: int, pos: int, size: int):
+        self.pos = pos
+        self.size = size
+        self._reader = reader
+        self._body = body
+        self._count = count
+        self._items = None
+
+    @property
+    def items(self):
+        if self._items is None:
+            self._items = self._reader._children(self)
+        return self._items
+
+    @items.setter
+    def items(self, value):
+        self._items = value
+
+
+class _TraceObject(_LazyItems, StructItemObject):
+    _named = True
+
+    def __init__(self, reader: 'TraceReader', body: int, count: int, pos: int, size: int, class_name: Optional[str]):
+        self.pos = pos
+        self.size = size
+        self._reader = reader
+        self._body = body
+        self._count = count
+        self._items = None
+        self.class_name = class_name
+
+
+class _TraceList(_LazyItems, StructItemList):
+    pass
+
+
+class TraceReader:
+    """
+    Decodes nodes of a trace buffer on demand. Strings are defined on first use in
+    pre-order, and any node is reached only after everything before it in pre-order has
+    been decoded or skipped, so the string table is always complete when it is needed.
+    """
+    def __init__(self, buf, data=None):
+        if bytes(buf[:4]) != TRACE_MAGIC:
+            raise ValueError("Not a bytewirez trace (bad magic)")
+        if buf[4] != TRACE_VERSION:
+            raise ValueError(f"Unsupported trace version {buf[4]}")
+        self._buf = buf
+        self._data = data
+        self._strings: List[Optional[str]] = [None]
+        # offset where each string is defined (a definition is a ref followed by the text)
+        self._defined: List[int] = [-1]
+
+    def _string(self, off: int) -> Tuple[Optional[str], int]:
+        buf = self._buf
+        start = off
+        ref = buf[off]
+        if ref < 0x80:
+            off += 1
+        else:
+            ref, off = decode_varint(buf, off)
+        strings = self._strings
+        if ref < len(strings) and self._defined[ref] != start:
+            return strings[ref], off
+        n, off = decode_varint(buf, off)
+        if ref == len(strings):
+            strings.append(str(buf[off:off + n], "utf-8"))
+            self._defined.append(start)
+        return strings[ref], off + n
+
+    def _node(self, off: int, last_pos: int, named: bool) -> Tuple[Optional[str], StructItem, int]:
+        """Decodes one node header at `off`; returns (name, item, offset after the header)."""
+        buf = self._buf
+        name = None
+        if named:
+            name, off = self._string(off)
+        tag = buf[off]
+        v = buf[off + 1]
+        if v < 0x80:
+            off += 2
+        else:
+            v, off = decode_varint(buf, off + 1)
+        pos = last_pos + ((v >> 1) if not v & 1 else -((v + 1) >> 1))
+        size = buf[off]
+        if size < 0x80:
+            off += 1
+        else:
+            size, off = decode_varint(buf, off)
+        if tag == TAG_DATA:
+            fmt, off = self._string(off)
+            raw = bytes(self._data[pos:pos + size]) if self._data is not None else b""
+            return name, DataItem(pos=pos, size=size, raw=raw, fmt=fmt), off
+        if tag == TAG_OBJECT:
+            class_name, off = self._string(off)
+            count, off = decode_varint(buf, off)
+            return name, _TraceObject(self, off, count, pos, size, class_name), off
+        if tag == TAG_LIST:
+            count, off = decode_varint(buf, off)
+            return name, _TraceList(self, off, count, pos, size), off
+        if tag == TAG_REF:
+            target, off = decode_varint(buf, off)
+            target_size, off = decode_varint(buf, off)
+            return name, RefItem(pos=pos, size=size, target=target, target_size=target_size), off
+        raise ValueError(f"Unknown trace tag {tag} at {off}")
+
+    def _skip(self, off: int, count: int, named: bool, last_pos: int) -> Tuple[int, int]:
+        """Skips `count` subtrees at `off` without creating items; returns (offset, last pos)."""
+        buf = self._buf
+        strings = self._strings
+        defined = self._defined
+        stack = [[count, named]]
+        while stack:
+            top = stack[-1]
+            if not top[0]:
+                stack.pop()
+                continue
+            top[0] -= 1
+            if top[1]:
+                ref = buf[off]
+                if ref < 0x80 and ref < len(strings) and defined[ref] != off:
+                    off += 1
+                else:
+                    _, off = self._string(off)
+            tag = buf[off]
+            v = buf[off + 1]
+            if v < 0x80:
+                off += 2
+            else:
+                v, off = decode_varint(buf, off + 1)
+            last_pos += (v >> 1) if not v & 1 else -((v + 1) >> 1)
+            if buf[off] < 0x80:
+                off += 1
+            else:
+                _, off = decode_varint(buf, off)
+            if tag == TAG_DATA:
+                ref = buf[off]
+                if ref < 0x80 and ref < len(strings) and defined[ref] != off:
+                    off += 1
+                else:
+                    _, off = self._string(off)
+            elif tag == TAG_OBJECT or tag == TAG_LIST:
+                if tag == TAG_OBJECT:
+                    _, off = self._string(off)
+                n, off = decode_varint(buf, off)
+                if n:
+                    stack.append([n, tag == TAG_OBJECT])
+            elif tag == TAG_REF:
+                _, off = decode_varint(buf, off)
+                _, off = decode_varint(buf, off)
+            else:
+                raise ValueError(f"Unknown trace tag {tag} at {off}")
+        return off, last_pos
+
+    def _children(self, container: _LazyItems) -> list:
+        named = container._named
+        off = container._body
+        last_pos = container.pos
+        out = []
+        for _ in range(container._count):
+            name, item, off = self._node(off, last_pos, named)
+            last_pos = item.pos
+            if isinstance(item, _LazyItems) and item._count:
+                off, last_pos = self._skip(off, item._count, item._named, last_pos)
+            out.append((name or "", item) if named else item)
+        return out
+
+    def root(self) -> StructItem:
+        return self._node(5, 0, False)[1]
+
+    def iter_nodes(self) -> Iterator[Tuple[int, Optional[str], StructItem]]:
+        """Yields (depth, name, item) for every node in pre-order, in a single pass."""
+        _, item, off = self._node(5, 0, False)
+        yield 0, None, item
+        last_pos = item.pos
+        stack = [[item._count, item._named]] if isinstance(item, _LazyItems) and item._count else []
+        while stack:
+            top = stack[-1]
+            if not top[0]:
+                stack.pop()
+                continue
+            top[0] -= 1
+            name, item, off = self._node(off, last_pos, top[1])
+            last_pos = item.pos
+            yield len(stack), name, item
+            if isinstance(item, _LazyItems) and item._count:
+                stack.append([item._count, item._named])
+
+
+class LoadedTrace:
+    """
+    A trace loaded back from disk. Provides get_root_element()/get_data() like
+    StructureReader, so the existing exporters can be used on it.
+    """
+    def __init__(self, root: Optional[StructItem], data=None):
+        self._root = root
+        self._data = data
+
+    def get_root_element(self) -> StructItem:
+        return self._root
+
+    def get_data(self) -> bytes:
+        return bytes(self._data) if self._data is not None else b""
+
+
+class LazyTrace(LoadedTrace):
+    """
+    A trace decoded on demand from its buffer (memory-mapped when loaded from a path).
+    Containers decode their children on first access of `items`; iter_nodes() streams
+    over all nodes. Close it (or use it as a context manager) to release the mapping,
+    nodes that were not decoded yet cannot be decoded afterwards.
+    """
+    def __init__(self, buf, data=None, mm: Optional[mmap.mmap] = None):
+        super().__init__(None, data)
+        self._reader = TraceReader(buf, data)
+        self._mm = mm
+
+    def get_root_element(self) -> StructItem:
+        if self._root is None:
+            self._root = self._reader.root()
+        return self._root
+
+    def iter_nodes(self) -> Iterator[Tuple[int, Optional[str], StructItem]]:
+        """Yields (depth, name, item) for every node in pre-order (containers stay lazy)."""
+        return self._reader.iter_nodes()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def __enter__(self) -> 'LazyTrace':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def structure_to_trace(reader, into_file: Union[str, BinaryIO]):
+    """Writes the reader's structure tree (or any object with get_root_element) as a binary trace."""
+    root = reader.get_root_element()
+    if isinstance(into_file, str):
+        with open(into_file, "wb") as f:
+            TraceWriter(f).write(root)
+    else:
+        TraceWriter(into_file).write(root)
+
+
+def load_trace(from_file: Union[str, bytes, bytearray, memoryview], data=None) -> LazyTrace:
+    """
+    Opens a binary trace for lazy decoding (memory-mapping it when a path is given).
+    `data` is the original data the trace was recorded from (needed for raw values).
+    """
+    if not isinstance(from_file, str):
+        return LazyTrace(from_file, data)
+    with open(from_file, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return LazyTrace(mm, data, mm)
+    except ValueError:
+        mm.close()
+        raise
+
+
+def _load_eager(from_file, data=None) -> LoadedTrace:
+    """Decodes the whole trace at once; the converters visit every node anyway."""
+    if not isinstance(from_file, str):
+        return LoadedTrace(parse_trace(from_file, data), data)
+    with open(from_file, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return LoadedTrace(parse_trace(mm, data), data)
+
+
+def trace_to_json(from_file, data=None, into_file=None):
+    """Converts a binary trace to the JSON produced by custom_json_serializer."""
+    return custom_json_serializer(_load_eager(from_file, data).get_root_element(), into_file=into_file)
+
+
+def trace_to_yaml(from_file, data=None) -> str:
+    """Converts a binary trace to YAML (see structure_to_yaml)."""
+    return structure_to_yaml(_load_eager(from_file, data))
+
+
+def trace_to_html_viewer(from_file, data=None, into_file=None, with_index: bool = False):
+    """Converts a binary trace to the HTML viewer JSON (see structure_to_html_viewer)."""
+    return structure_to_html_viewer(_load_eager(from_file, data), into_file=into_file, with_index=with_index)
@@ -0,0 +1,160 @@
+"""
+Bounded sliding window over an unbounded (non-seekable) stream.
+
+Data is pulled from the source as it is needed and kept in a buffer covering
+[start, end) of the stream. Once the buffer grows past `window` bytes the oldest data
+before the current position is dropped; commit()/discard_before() release consumed data
+explicitly. Seeking/peeking into dropped data raises WindowError, reading ahead pulls
+more data from the source. Memory use stays around `window` bytes no matter how long
+the stream is. Positions saved by the Wire (pushd, peek, follow) are held: seeking or
+reading so far ahead that they would be dropped raises WindowError instead.
+"""
+import io
+import os
+from typing import BinaryIO, List, Optional
+
+from .bytewirez import ENDIAN_BIG, Wire
+
+READ_CHUNK = 64 * 1024
+
+
+class WindowError(IndexError):
+    """Access outside of the retained window of a SlidingWindow."""
+
+
+class SlidingWindow(io.RawIOBase):
+    """Seekable (within the window) read-only file object over a stream."""
+    def __init__(self, source: BinaryIO, window: int = 1 << 20, read_chunk: int = READ_CHUNK):
+        super().__init__()
+        self._src = source
+        self.window = window
+        self.read_chunk = read_chunk
+        # bytearray drops its head in O(1) amortized (del buf[:n] just moves the start)
+        self._buf = bytearray()
+        self._start = 0
+        self._pos = 0
+        self._eof = False
+        # live position lists of every Wire reading through this window
+        self._held: List[List[int]] = []
+
+    def wire(self, endian: str = ENDIAN_BIG) -> Wire:
+        """Returns a Wire reading through this window."""
+        wire = Wire.from_fd(self)
+        wire.set_endian(endian)
+        self.hold(wire._pos_stack)
+        return wire
+
+    def hold(self, positions: List[int]):
+        """
+        Keeps the stream offsets in `positions` (a live list, e.g. the position stack of a Wire)
+        retained: automatic discards stop at the lowest one. Every held list is kept.
+        """
+        if not any(held is positions for held in self._held):
+            self._held.append(positions)
+
+    def release(self, positions: List[int]):
+        """Stops holding a list passed to hold()."""
+        self._held = [held for held in self._held if held is not positions]
+
+    def _lowest_held(self) -> Optional[int]:
+        lows = [min(held) for held in self._held if held]
+        return min(lows) if lows else None
+
+    def _low_water(self) -> int:
+        """Oldest offset the automatic discard has to keep."""
+        low = self._lowest_held()
+        return self._pos if low is None else min(self._pos, low)
+
+    def _check_reach(self, pos: int):
+        """Raises WindowError if retaining data up to `pos` would drop a held position."""
+        low = self._lowest_held()
+        if low is None:
+            return
+        low = max(self._start, low)
+        if pos > max(self.end, low + self.window):
+            raise WindowError(
+                f"Cannot reach {pos}: held position {low} would leave the window ({self.window} bytes)"
+            )
+
+    @property
+    def start(self) -> int:
+        """Oldest stream offset still retained."""
+        return self._start
+
+    @property
+    def end(self) -> int:
+        """Stream offset right after the last byte pulled from the source."""
+        return self._start + len(self._buf)
+
+    def discard_before(self, pos: int):
+        """Releases retained data before stream offset `pos`."""
+        n = min(pos, self.end) - self._start
+        if n > 0:
+            del self._buf[:n]
+            self._start += n
+
+    def commit(self):
+        """Releases everything before the current position (consumed data)."""
+        self.discard_before(self._pos)
+
+    def _fill(self, upto: int):
+        """Pulls data from the source until `upto` is retained (or the stream ends)."""
+        if not self._eof:
+            self._check_reach(upto)
+        while not self._eof and self.end < upto:
+            # bounded pulls, so skipping far ahead does not load everything in between
+            data = self._src.read(min(max(self.read_chunk, upto - self.end), max(self.window, self.read_chunk)))
+            if not data:
+                self._eof = True
+                break
+            self._buf += data
+            excess = len(self._buf) - self.window
+            if excess > 0:
+                # never drop data at or after the current (or a held) position
+                self.discard_before(self._start + min(excess, self._low_water() - self._start))
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        if self._pos < self._start:
+            raise WindowError(f"Position {self._pos} was discarded (window starts at {self._start})")
+        if size is None or size < 0:
+            while not self._eof:
+                self._fill(self.end + self.read_chunk)
+            size = max(0, self.end - self._pos)
+        self._fill(self._pos + size)
+        off = self._pos - self._start
+        data = bytes(self._buf[off:off + size])
+        self._pos += len(data)
+        return data
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            pos = offset
+        elif whence == os.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == os.SEEK_END:
+            raise io.UnsupportedOperation("SlidingWindow: the size of a stream is not known")
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if pos < self._start:
+            raise WindowError(f"Cannot seek to {pos}: data before {self._start} was discarded")
+        self._check_reach(pos)
+        self._pos = pos
+        return pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self):
+        self._buf = bytearray()
+        super().close()
@@ -1,8 +1,13 @@
 import unittest
 import struct
 import io
+import hashlib
+import os
+import subprocess
+import sys
+import zlib
 from bytewirez import (
-    Wire, StructureReader, hexdump, unpack_ex,
+    Wire, StructureReader, gather_write, hexdump, unpack_ex,
     ENDIAN_BIG, ENDIAN_LITTLE,
 )
 
@@ -204,6 +209,111 @@ class TestWireHooks(unittest.TestCase):
         self.assertEqual(w.read(5), b'HELLO')
 
 
+class TestWireWriteBuffer(unittest.TestCase):
+    def test_buffered_bytesio(self):
+        w = Wire.empty()
+        w.enable_write_buffer(threshold=1024)
+        w.write_word(0x0102)
+        w.write(b"abc")
+        self.assertEqual(w._obj.getvalue(), b"")
+        self.assertEqual(w.get_pos(), 5)
+        self.assertEqual(w.dump(), b"\x01\x02abc")
+
+    def test_threshold_flush(self):
+        w = Wire.empty()
+        w.enable_write_buffer(threshold=4)
+        w.write(b"ab")
+        self.assertEqual(w._obj.getvalue(), b"")
+        w.write(b"cd")
+        self.assertEqual(w._obj.getvalue(), b"abcd")
+
+    def test_read_after_write_flushes(self):
+        w = Wire.empty()
+        w.enable_write_buffer()
+        w.write_dword(7)
+        w.goto_begin()
+        self.assertEqual(w.read_dword(), 7)
+
+    def test_hooks_still_called(self):
+        seen = []
+        w = Wire.empty()
+        w.enable_write_buffer()
+        w.install_hook(w.write, pre=lambda b: seen.append(b))
+        w.write_byte(1)
+        w.write_byte(2)
+        self.assertEqual(seen, [b"\x01", b"\x02"])
+        w.disable_write_buffer()
+        self.assertEqual(w.dump(), b"\x01\x02")
+
+    def test_writev_file(self):
+        import tempfile
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            with open(path, "r+b", buffering=0) as f:
+                w = Wire.from_fd(f)
+                w.enable_write_buffer()
+                for i in range(3000):
+                    w.write_word(i)
+                w.flush()
+                self.assertEqual(w.get_pos(), 6000)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), b"".join(struct.pack(">H", i) for i in range(3000)))
+        finally:
+            os.unlink(path)
+
+    def test_socket_sendmsg(self):
+        import socket
+        a, b = socket.socketpair()
+        with a, b:
+            w = Wire.from_fd(a)
+            w.enable_write_buffer()
+            w.write(b"hello ")
+            w.write(b"world")
+            w.flush()
+            self.assertEqual(b.recv(100), b"hello world")
+            w.disable_write_buffer()
+            w.write_word(0x4142)
+            self.assertEqual(b.recv(100), b"AB")
+            self.assertEqual(w.get_pos(), 13)
+
+    def test_failed_flush_keeps_chunks(self):
+        class Flaky(io.BytesIO):
+            fail = True
+
+            def write(self, b):
+                if self.fail:
+                    self.fail = False
+                    raise BlockingIOError(11, "would block")
+                return super().write(b)
+
+        w = Wire.from_fd(Flaky())
+        w.enable_write_buffer()
+        w.write(b"abc")
+        w.write_word(0x4142)
+        with self.assertRaises(BlockingIOError):
+            w.flush()
+        self.assertEqual(w.get_pos(), 5)
+        w.flush()
+        self.assertEqual(w.dump(), b"abcAB")
+
+    def test_gather_write_partial(self):
+        sent = []
+
+        def send(batch):
+            if len(sent) == 2:
+                raise BlockingIOError(11, "would block")
+            data = b"".join(bytes(c) for c in batch)[:3]
+            sent.append(data)
+            return len(data)
+
+        chunks = [b"ab", b"cd", b"ef", b"gh"]
+        with self.assertRaises(BlockingIOError):
+            gather_write(send, chunks)
+        self.assertEqual(b"".join(sent), b"abcdef")
+        self.assertEqual([bytes(c) for c in chunks], [b"gh"])
+
+
 class TestUnpackEx(unittest.TestCase):
     def test_single_value(self):
         data = struct.pack(">I", 42)
@@ -288,6 +398,42 @@ class TestStructureReader(unittest.TestCase):
         self.assertEqual(r.get_data(), b'\xAA\xBB\xCC\xDD')
 
 
+class TestWireDigest(unittest.TestCase):
+    PAYLOAD = bytes(range(256)) * 50
+
+    def test_digest_reads(self):
+        w = Wire.from_bytes(self.PAYLOAD + struct.pack(">I", zlib.crc32(self.PAYLOAD)))
+        with w.digest("crc32") as d:
+            w.read(100)
+            w.readn(len(self.PAYLOAD) - 100)
+        self.assertEqual(d.value, w.read_dword())
+        self.assertEqual(d.size, len(self.PAYLOAD))
+        # detached: the hooks are gone
+        self.assertEqual(w._post_hooks["read"], [])
+
+    def test_digest_writes(self):
+        w = Wire.empty()
+        w.enable_write_buffer()
+        with w.digest("sha256", reads=False) as d:
+            w.write(self.PAYLOAD[:10])
+            w.write_fmt("H", 7)
+        self.assertEqual(d.value, hashlib.sha256(self.PAYLOAD[:10] + b"\x00\x07").digest())
+        self.assertEqual(w._pre_hooks["write"], [])
+
+    def test_checksum(self):
+        for w in (Wire.from_bytes(self.PAYLOAD), Wire.from_fd(io.BufferedReader(io.BytesIO(self.PAYLOAD)))):
+            w.goto(5)
+            self.assertEqual(w.checksum(), zlib.crc32(self.PAYLOAD))
+            self.assertEqual(w.checksum(10, 300, "adler32"), zlib.adler32(self.PAYLOAD[10:300]))
+            self.assertEqual(w.checksum(algo="md5"), hashlib.md5(self.PAYLOAD).digest())
+            self.assertEqual(w.get_pos(), 5)
+
+    def test_checksum_chunks(self):
+        from bytewirez import checksum
+        w = Wire.from_bytes(self.PAYLOAD)
+        self.assertEqual(checksum(w, 3, None, "crc32", chunk_size=7), zlib.crc32(self.PAYLOAD[3:]))
+
+
 class TestBackwardCompatProxy(unittest.TestCase):
     def test_import_from_proxy(self):
         import importlib
@@ -295,6 +441,20 @@ class TestBackwardCompatProxy(unittest.TestCase):
         self.assertTrue(hasattr(mod, "Wire"))
         self.assertTrue(hasattr(mod, "StructureReader"))
 
+    def test_moved_names_still_in_core_module(self):
+        from src.bytewirez.bytewirez import StructureReader as moved
+        from bytewirez import StructureReader
+        self.assertIs(moved, StructureReader)
+
+    def test_import_is_lazy(self):
+        code = (
+            "import sys, bytewirez; bytewirez.Wire.from_bytes(b'x').read_byte();"
+            "print(sorted(m for m in ('logging', 'dataclasses', 'typing', 'src.bytewirez.structure') if m in sys.modules))"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        out = subprocess.run([sys.executable, "-c", code], cwd=root, stdout=subprocess.PIPE, check=True)
+        self.assertEqual(out.stdout.strip(), b"[]")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,113 @@
+import io
+import struct
+import unittest
+import zlib
+from bytewirez import StructureReader, Wire, ENDIAN_LITTLE, columns_from_buffer
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+COUNT = 1000
+FMT = "IhB4sd?"
+NAMES = ["id", "delta", "flag", "tag", "value", "ok"]
+
+
+def records(endian: str) -> bytes:
+    return b"".join(
+        struct.pack(endian + FMT, i, -i, i % 256, b"t%03d" % (i % 1000), i / 2, i % 3 == 0)
+        for i in range(COUNT)
+    )
+
+
+class TestColumnsFallback(unittest.TestCase):
+    def _check(self, cols, start=0):
+        self.assertEqual(list(cols["id"][:3]), [start, start + 1, start + 2])
+        self.assertEqual(cols["delta"][1], -(start + 1))
+        self.assertEqual(cols["flag"][-1], (start + len(cols["id"]) - 1) % 256)
+        self.assertEqual(cols["tag"][0], b"t%03d" % start)
+        self.assertEqual(cols["value"][4], (start + 4) / 2)
+        self.assertEqual(cols["ok"][3], (start + 3) % 3 == 0)
+
+    def test_big_endian(self):
+        w = Wire.from_bytes(records(">"))
+        cols = w.read_columns(FMT, NAMES, COUNT, use_numpy=False)
+        self.assertIn(cols["id"].typecode, "IL")
+        self._check(cols)
+        self.assertEqual(w.bytes_available(), 0)
+
+    def test_little_endian_and_offset(self):
+        w = Wire.from_bytes(records("<"))
+        w.set_endian(ENDIAN_LITTLE)
+        size = struct.calcsize("<" + FMT)
+        w.goto(size * 10)
+        cols = w.read_columns(FMT, NAMES, 100, use_numpy=False)
+        self._check(cols, start=10)
+        self.assertEqual(w.get_pos(), size * 110)
+
+    def test_native_alignment(self):
+        data = records("@")
+        cols = columns_from_buffer("@" + FMT, data, COUNT, NAMES)
+        self._check(cols)
+
+    def test_zero_count(self):
+        cols = columns_from_buffer(">" + FMT, records(">"), 0, NAMES)
+        self.assertEqual(sorted(cols), sorted(NAMES))
+        self.assertTrue(all(len(col) == 0 for col in cols.values()))
+
+    def test_bools(self):
+        cols = columns_from_buffer(">" + FMT, records(">"), 6, NAMES)
+        self.assertEqual(cols["ok"], [True, False, False, True, False, False])
+
+    def test_names(self):
+        data = struct.pack(">HHH", 1, 2, 3)
+        cols = columns_from_buffer(">HHH", data, 1, ["a", None])
+        self.assertEqual(sorted(cols), ["a", "field_2"])
+        with self.assertRaises(struct.error):
+            columns_from_buffer(">H", data, 1, ["a", "b"])
+
+    def test_read_hooks_see_columns(self):
+        data = records(">")
+        size = struct.calcsize(">" + FMT)
+        w = Wire.from_bytes(data)
+        r = StructureReader(w)
+        with w.digest("crc32") as d:
+            cols = r.will_read("cols").read_columns(FMT, NAMES, 10, use_numpy=False)
+        self._check(cols)
+        self.assertEqual(d.value, zlib.crc32(data[:size * 10]))
+        name, item = r.get_root_element().items[0]
+        self.assertEqual((name, item.pos, item.size), ("cols", 0, size * 10))
+        self.assertEqual(w.get_pos(), size * 10)
+
+    def test_eof(self):
+        w = Wire.from_fd(io.BufferedReader(io.BytesIO(records(">"))))
+        with self.assertRaises(EOFError):
+            w.read_columns(FMT, NAMES, COUNT + 1, use_numpy=False)
+        self.assertEqual(w.get_pos(), 0)
+
+
+@unittest.skipIf(numpy is None, "numpy not installed")
+class TestColumnsNumpy(unittest.TestCase):
+    def test_structured_array(self):
+        w = Wire.from_bytes(records(">"))
+        arr = w.read_columns(FMT, NAMES, COUNT)
+        self.assertEqual(arr.shape, (COUNT, ))
+        self.assertEqual(int(arr["id"][5]), 5)
+        self.assertEqual(int(arr["delta"][5]), -5)
+        self.assertEqual(arr["tag"][5], b"t005")
+        self.assertEqual(float(arr["value"][5]), 2.5)
+        self.assertFalse(arr.flags.owndata)
+
+    def test_matches_fallback(self):
+        data = records("<")
+        w = Wire.from_bytes(data)
+        w.set_endian(ENDIAN_LITTLE)
+        arr = w.read_columns(FMT, NAMES, COUNT)
+        cols = columns_from_buffer("<" + FMT, data, COUNT, NAMES)
+        for name in NAMES:
+            self.assertEqual(list(arr[name]), list(cols[name]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import bz2
+import gzip
+import lzma
+import os
+import random
+import tempfile
+import unittest
+import zlib
+from bytewirez import Wire, CompressedReader, detect_codec
+
+rnd = random.Random(1234)
+# compressible but not trivial data
+DATA = b"".join(rnd.choice([b"alpha", b"beta", b"gamma", bytes([rnd.randrange(256)])]) for _ in range(200000))
+
+
+class _CompressedTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def _write(self, blob):
+        with open(self.path, "wb") as f:
+            f.write(blob)
+
+    def _check_random_access(self, reader):
+        for at in [500000, 10, len(DATA) - 7, 123456, 0, 400000, 399990]:
+            reader.seek(at)
+            self.assertEqual(reader.read(100), DATA[at:at + 100], f"at {at}")
+
+
+class TestGzip(_CompressedTest):
+    def test_random_access(self):
+        self._write(gzip.compress(DATA))
+        with CompressedReader.open(self.path, checkpoint_every=64 * 1024, window=16 * 1024) as r:
+            self.assertEqual(r.codec, "gzip")
+            self._check_random_access(r)
+            self.assertGreater(len(r.checkpoints), 5)
+            self.assertEqual(r.size(), len(DATA))
+
+    def test_multi_member(self):
+        half = len(DATA) // 2
+        self._write(gzip.compress(DATA[:half]) + gzip.compress(DATA[half:]))
+        with CompressedReader.open(self.path, checkpoint_every=1 << 30, window=4096) as r:
+            self.assertEqual(r.read(), DATA)
+            self.assertIn(half, r.checkpoints)
+            self._check_random_access(r)
+
+    def test_zero_padding(self):
+        half = len(DATA) // 2
+        self._write(gzip.compress(DATA[:half]) + bytes(100) + gzip.compress(DATA[half:]) + bytes(1 << 17))
+        with gzip.open(self.path) as f:
+            self.assertEqual(f.read(), DATA)
+        with CompressedReader.open(self.path, window=4096) as r:
+            self.assertEqual(r.read(), DATA)
+            self.assertEqual(r.size(), len(DATA))
+            self._check_random_access(r)
+
+    def test_wire(self):
+        self._write(gzip.compress(DATA))
+        w = Wire.from_compressed(self.path)
+        w.goto(1000)
+        self.assertEqual(w.peek(8), DATA[1000:1008])
+        self.assertEqual(w.readn(8), DATA[1000:1008])
+        self.assertEqual(w.bytes_available(), len(DATA) - 1008)
+        self.assertEqual(w.hexdump(16), Wire.from_bytes(DATA[1008:]).hexdump(16).replace("0x0000", "0x03F0"))
+
+
+class TestZlib(_CompressedTest):
+    def test_random_access(self):
+        self._write(zlib.compress(DATA))
+        with CompressedReader.open(self.path, checkpoint_every=64 * 1024) as r:
+            self.assertEqual(r.codec, "zlib")
+            self._check_random_access(r)
+
+
+class TestBz2Xz(_CompressedTest):
+    def test_bz2_streams(self):
+        third = len(DATA) // 3
+        self._write(b"".join(bz2.compress(DATA[i:i + third]) for i in range(0, len(DATA), third)))
+        with CompressedReader.open(self.path, window=4096) as r:
+            self.assertEqual(r.codec, "bz2")
+            self._check_random_access(r)
+            self.assertIn(third, r.checkpoints)
+
+    def test_xz(self):
+        self._write(lzma.compress(DATA))
+        w = Wire.from_compressed(self.path)
+        w.goto(300000)
+        self.assertEqual(w.read_fmt("4s"), DATA[300000:300004])
+
+
+class TestDetect(unittest.TestCase):
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            detect_codec(b"PK\x03\x04")
+
+
+if __name__ == "__main__":
+    unittest.main()
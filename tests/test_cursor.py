@@ -0,0 +1,92 @@
+import os
+import struct
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from bytewirez import SharedStore, ENDIAN_LITTLE
+
+RECORDS = 2000
+DATA = b"".join(struct.pack(">IH", i, i % 65536) for i in range(RECORDS))
+
+
+class TestSharedStoreBuffer(unittest.TestCase):
+    def test_independent_cursors(self):
+        store = SharedStore.from_buffer(DATA)
+        a = store.cursor()
+        b = store.cursor(pos=6)
+        self.assertEqual(a.read_dword(), 0)
+        self.assertEqual(b.read_dword(), 1)
+        self.assertEqual(a.get_pos(), 4)
+        self.assertEqual(b.get_pos(), 10)
+
+    def test_peek_pushd_popd(self):
+        c = SharedStore.from_buffer(DATA).cursor()
+        c.pushd()
+        c.goto(12)
+        self.assertEqual(c.peek_fmt("I"), 2)
+        c.popd()
+        self.assertEqual(c.get_pos(), 0)
+
+    def test_endian_per_cursor(self):
+        store = SharedStore.from_buffer(b"\x01\x02")
+        self.assertEqual(store.cursor().read_word(), 0x0102)
+        self.assertEqual(store.cursor(endian=ENDIAN_LITTLE).read_word(), 0x0201)
+
+    def test_eof(self):
+        c = SharedStore.from_buffer(b"\x01").cursor()
+        self.assertEqual(c.bytes_available(), 1)
+        with self.assertRaises(EOFError):
+            c.read_word()
+
+    def test_hooks_per_cursor(self):
+        store = SharedStore.from_buffer(DATA)
+        calls = []
+        a = store.cursor()
+        a.install_hook(a.read, pre=lambda *x, **kw: calls.append(x))
+        store.cursor().read_dword()
+        a.read_dword()
+        self.assertEqual(len(calls), 1)
+
+
+class TestSharedStoreFile(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, "wb") as f:
+            f.write(DATA)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def _decode(self, store, i):
+        c = store.cursor(pos=i * 6)
+        return c.read_fmt("IH")
+
+    def _check_threads(self, store):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda i: self._decode(store, i), range(RECORDS)))
+        self.assertEqual(results, [(i, i % 65536) for i in range(RECORDS)])
+
+    @unittest.skipUnless(hasattr(os, "pread"), "os.pread not available")
+    def test_threads_pread(self):
+        with SharedStore.from_file(self.path) as store:
+            self._check_threads(store)
+            self.assertEqual(os.lseek(store._fd, 0, os.SEEK_CUR), 0)
+
+    def test_threads_mmap(self):
+        with SharedStore.from_file(self.path, use_mmap=True) as store:
+            self._check_threads(store)
+
+    def test_close_with_live_view(self):
+        store = SharedStore.from_file(self.path, use_mmap=True)
+        view = store.cursor()._obj.getbuffer()
+        with self.assertRaises(BufferError):
+            store.close()
+        # the failed close leaves the store usable
+        self.assertEqual(store.cursor(pos=6).read_fmt("IH"), (1, 1))
+        view.release()
+        store.close()
+        self.assertIsNone(store._view)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import json
+import unittest
+from bytewirez import (
+    Wire, StructureReader, Change, ByteChange, diff_structures, diff_wires, block_hashes, iter_diff_wires,
+    custom_json_serializer,
+)
+
+
+def _reader(data, extra_field=False, count=3):
+    w = Wire(from_bytes=data)
+    st = StructureReader(w)
+    st.will_read("magic").read(2)
+    st.will_read("version").read_word()
+    with st.will_read("items").start_list():
+        for _ in range(count):
+            with st.start_object(class_name="Item"):
+                st.will_read("v").read_byte()
+    if extra_field:
+        st.will_read("extra").read_byte()
+    return st.get_root_element()
+
+
+class TestDiffStructures(unittest.TestCase):
+    def test_identical(self):
+        data = b"MZ\x00\x01\x0a\x0b\x0c"
+        self.assertEqual(diff_structures(_reader(data), _reader(data)), [])
+
+    def test_value_change(self):
+        changes = diff_structures(_reader(b"MZ\x00\x01\x0a\x0b\x0c"), _reader(b"MZ\x00\x02\x0a\x0b\x0d"))
+        self.assertEqual(changes, [
+            Change("version", "changed", 1, 2, 2),
+            Change("items[2].v", "changed", 12, 13, 6),
+        ])
+
+    def test_added_removed(self):
+        old = _reader(b"MZ\x00\x01\x0a\x0b\x0c\x00", count=3)
+        new = _reader(b"MZ\x00\x01\x0a\x0b\x0c", count=2, extra_field=True)
+        changes = diff_structures(old, new)
+        self.assertEqual([(c.path, c.kind) for c in changes], [
+            ("items[2]", "removed"),
+            ("extra", "added"),
+        ])
+
+    def test_json(self):
+        changes = diff_structures(_reader(b"MZ\x00\x01\x0a\x0b\x0c"), _reader(b"PE\x00\x01\x0a\x0b\x0c"))
+        out = json.loads(custom_json_serializer(changes, ))
+        self.assertEqual(out[0]["path"], "magic")
+
+
+class TestDiffWires(unittest.TestCase):
+    def setUp(self):
+        self.old = bytes(range(256)) * 1000
+        new = bytearray(self.old)
+        new[10] = 0xFF
+        new[5000:5004] = b"abcd"
+        new[65535:65537] = b"\x01\x01"  # crosses a block boundary
+        self.new = bytes(new)
+
+    def test_runs(self):
+        changes = diff_wires(Wire.from_bytes(self.old), Wire.from_bytes(self.new), block_size=4096)
+        self.assertEqual([c.offset for c in changes], [10, 5000, 65535])
+        self.assertEqual(changes[1], ByteChange(5000, self.old[5000:5004], b"abcd"))
+        self.assertEqual(len(changes[2].new), 2)
+
+    def test_with_hashes(self):
+        a, b = Wire.from_bytes(self.old), Wire.from_bytes(self.new)
+        changes = diff_wires(a, b, block_size=4096, old_hashes=block_hashes(a, 4096), new_hashes=block_hashes(b, 4096))
+        self.assertEqual([c.offset for c in changes], [10, 5000, 65535])
+
+    def test_size_difference(self):
+        changes = diff_wires(Wire.from_bytes(b"abcdef"), Wire.from_bytes(b"abXdefgh"))
+        self.assertEqual(changes, [ByteChange(2, b"c", b"X"), ByteChange(6, b"", b"gh")])
+
+    def test_hashes_block_size_mismatch(self):
+        a, b = Wire.from_bytes(self.old), Wire.from_bytes(self.new)
+        with self.assertRaises(ValueError):
+            diff_wires(a, b, block_size=4096, old_hashes=block_hashes(a, 1024), new_hashes=block_hashes(b, 4096))
+        with self.assertRaises(ValueError):
+            diff_wires(a, b, block_size=4096, old_hashes=list(block_hashes(a, 4096)), new_hashes=block_hashes(b, 4096))
+
+    def test_tail_in_blocks(self):
+        changes = iter_diff_wires(Wire.from_bytes(self.old), Wire.from_bytes(self.old + bytes(10000)), block_size=4096)
+        tail = [c for c in changes if c.offset >= len(self.old)]
+        self.assertEqual([(c.offset, len(c.new)) for c in tail], [
+            (len(self.old), 4096), (len(self.old) + 4096, 4096), (len(self.old) + 8192, 1808),
+        ])
+        self.assertTrue(all(c.old == b"" for c in tail))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import io
+import json
+import struct
+import unittest
+from bytewirez import (
+    DecodeMemo, FollowCycleError, RefItem, StructureReader, Wire,
+    custom_json_serializer, diff_structures, load_trace, structure_to_trace,
+)
+
+# string table at 0x20, records pointing into it (two share the same string)
+TABLE = b"alpha\x00beta\x00"
+RECORDS = struct.pack(">HHH", 0x20, 0x26, 0x20)
+DATA = RECORDS + bytes(0x20 - len(RECORDS)) + TABLE
+
+
+def read_cstring(w: Wire) -> bytes:
+    n = w.peek(64).index(b"\x00")
+    return w.readn(n + 1)[:-1]
+
+
+class TestFollow(unittest.TestCase):
+    def test_memo_and_position(self):
+        w = Wire.from_bytes(DATA)
+        calls = []
+
+        def decoder(wire):
+            calls.append(wire.get_pos())
+            return read_cstring(wire)
+
+        names = [w.follow(w.read_word(), decoder) for _ in range(3)]
+        self.assertEqual(names, [b"alpha", b"beta", b"alpha"])
+        self.assertEqual(calls, [0x20, 0x26])
+        self.assertEqual(w.get_pos(), 6)
+
+    def test_cycle(self):
+        # linked list whose last node points back to the first one
+        w = Wire.from_bytes(struct.pack(">HHHH", 1, 4, 2, 0))
+
+        def node(wire):
+            value, nxt = wire.read_fmt("HH")
+            return [value] + wire.follow(nxt, node)
+
+        with self.assertRaises(FollowCycleError):
+            w.follow(0, node)
+        self.assertEqual(w.get_pos(), 0)
+        self.assertEqual(w._following, set())
+
+    def test_memo_budget(self):
+        memo = DecodeMemo(max_entries=2)
+        for i in range(3):
+            memo.put((i, None), i, 10)
+        self.assertNotIn((0, None), memo)
+        self.assertEqual(memo.total_bytes, 20)
+
+        memo = DecodeMemo(max_bytes=25)
+        memo.put((0, None), "a", 10)
+        memo.put((1, None), "b", 10)
+        memo.get((0, None))
+        memo.put((2, None), "c", 10)
+        self.assertEqual(len(memo), 2)
+        self.assertNotIn((1, None), memo)
+        memo.put((3, None), "huge", 100)
+        self.assertNotIn((3, None), memo)
+
+    def test_set_follow_cache(self):
+        w = Wire.from_bytes(DATA)
+        w.set_follow_cache(max_entries=0)
+        calls = []
+        decoder = lambda wire: calls.append(1) or read_cstring(wire)
+        w.follow(0x20, decoder)
+        w.follow(0x20, decoder)
+        self.assertEqual(len(calls), 2)
+
+
+class TestFollowStructureReader(unittest.TestCase):
+    def _read(self, data=DATA):
+        w = Wire.from_bytes(data)
+        r = StructureReader(w)
+        with r.start_list():
+            for _ in range(3):
+                with r.start_object("Record"):
+                    ptr = r.will_read("ptr", "name").read_fmt("H")
+                    w.follow(ptr, read_cstring)
+        return r
+
+    def test_records_reference(self):
+        root = self._read().get_root_element()
+        records = root.items[0][1].items
+        first = dict(records[0].items)
+        third = dict(records[2].items)
+        self.assertEqual(first["name"].kind, "DATA")
+        self.assertIsInstance(third["name"], RefItem)
+        self.assertEqual(third["name"].target, 0x20)
+        self.assertEqual(third["name"].target_size, 6)
+        self.assertEqual(third["name"].size, 0)
+        d = json.loads(custom_json_serializer(third["name"]))
+        self.assertEqual(d, {"TYPE": "REF", "POS": 6, "SIZE": 0, "TARGET": 0x20, "TARGET_SIZE": 6})
+
+    def test_trace_round_trip(self):
+        r = self._read()
+        buf = io.BytesIO()
+        structure_to_trace(r, buf)
+        loaded = load_trace(buf.getvalue(), data=DATA)
+        self.assertEqual(diff_structures(r.get_root_element(), loaded.get_root_element()), [])
+        records = loaded.get_root_element().items[0][1].items
+        self.assertEqual(dict(records[2].items)["name"], dict(r.get_root_element().items[0][1].items[2].items)["name"])
+
+    def test_diff_target(self):
+        other = struct.pack(">HHH", 0x20, 0x26, 0x26) + DATA[6:]
+        changes = diff_structures(self._read().get_root_element(), self._read(other).get_root_element())
+        self.assertTrue(any(c.path.endswith("name") and c.new == 0x26 for c in changes))
+
+
+if __name__ == "__main__":
+    unittest.main()
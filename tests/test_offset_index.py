@@ -0,0 +1,99 @@
+import json
+import unittest
+from bytewirez import (
+    Wire, StructureReader, OffsetIndex, structure_to_html_viewer, format_path,
+)
+
+
+def _sample_reader():
+    w = Wire(from_bytes=bytes.fromhex('11223344 2222 2222 fefe 1234 12345678 88 99 f1 f2 f3'))
+    st = StructureReader(w)
+    st.will_read("field1").read(4)
+    st.will_read("field2").read_word()
+    st.will_read("field3").read_word()
+    with st.will_read("obj1").start_object(class_name='FooClass'):
+        st.will_read("ob1_field1").read_word()
+        st.will_read("many_fields").read_fmt("IBB")
+        with st.will_read("array1").start_list():
+            for _ in range(3):
+                w.read(1)
+    return st
+
+
+class TestOffsetIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = OffsetIndex.build(_sample_reader().get_root_element())
+
+    def test_leaf_count(self):
+        self.assertEqual(len(self.index), 8)
+
+    def test_lookup(self):
+        self.assertEqual(self.index.lookup(0), "field1")
+        self.assertEqual(self.index.lookup(3), "field1")
+        self.assertEqual(self.index.lookup(4), "field2")
+        self.assertEqual(self.index.lookup(13), "obj1.many_fields")
+        self.assertEqual(self.index.lookup(17), "obj1.array1[1]")
+
+    def test_lookup_outside(self):
+        self.assertIsNone(self.index.lookup(21))
+        self.assertIsNone(self.index.lookup(-1))
+
+    def test_lookup_node_matches_preorder(self):
+        # root=0, field1=1, field2=2, field3=3, obj1=4, ob1_field1=5
+        self.assertEqual(self.index.lookup_node(8), 5)
+
+    def test_fields_in_range(self):
+        found = self.index.fields_in_range(3, 8)
+        self.assertEqual([p for _, _, p in found], ["field1", "field2", "field3"])
+        self.assertEqual(self.index.fields_in_range(100, 200), [])
+
+    def test_overlapping_fields(self):
+        w = Wire(from_bytes=b'\x00' * 8)
+        st = StructureReader(w)
+        st.will_read("whole").read(8)
+        w.goto(2)
+        st.will_read("inner").read(2)
+        index = OffsetIndex.build(st.get_root_element())
+        self.assertEqual(index.lookup(3), "inner")
+        self.assertEqual(index.lookup(6), "whole")
+        self.assertEqual(len(index.fields_in_range(0, 1)), 1)
+
+    def test_covering_leaf(self):
+        # a blob read first, then re-parsed field by field with gaps (goto)
+        n = 200000
+        starts = [0] + [4 * i for i in range(n)]
+        ends = [4 * n] + [4 * i + 2 for i in range(n)]
+        paths = ["blob"] + [f"f[{i}]" for i in range(n)]
+        index = OffsetIndex(starts, ends, paths, list(range(n + 1)))
+        for i in range(0, n, 997):
+            self.assertEqual(index.lookup(4 * i + 1), f"f[{i}]")
+            self.assertEqual(index.lookup(4 * i + 3), "blob")
+            found = index.fields_in_range(4 * i + 1, 4 * i + 6)
+            self.assertEqual([p for _, _, p in found], ["blob", f"f[{i}]", f"f[{i + 1}]"] if i + 1 < n else ["blob", f"f[{i}]"])
+        self.assertIsNone(index.lookup(4 * n))
+        # only the visited subtrees are touched, not every leaf before the offset
+        calls = []
+        original = index._last_ending_after
+
+        def counting(*a):
+            calls.append(a)
+            return original(*a)
+        index._last_ending_after = counting
+        index.lookup(4 * (n - 1) + 3)
+        self.assertLess(len(calls), 100)
+
+    def test_roundtrip_dict(self):
+        copy = OffsetIndex.from_dict(json.loads(json.dumps(self.index.to_dict())))
+        self.assertEqual(copy.lookup(17), "obj1.array1[1]")
+
+    def test_html_viewer_export(self):
+        data = json.loads(structure_to_html_viewer(_sample_reader(), with_index=True))
+        self.assertIn("index", data)
+        self.assertEqual(len(data["index"]["starts"]), 8)
+
+    def test_format_path(self):
+        self.assertEqual(format_path(("a", 3, "b")), "a[3].b")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+import unittest
+from bytewirez import Wire, StructureReader, structure_to_paged_viewer
+
+
+def _list_reader(count):
+    w = Wire(from_bytes=bytes(range(256)) * (count * 2 // 256 + 1))
+    st = StructureReader(w)
+    st.will_read("magic").read_word()
+    st.will_read("records")
+    with st.start_list():
+        for _ in range(count):
+            with st.start_object(class_name="Rec"):
+                st.will_read("a").read_byte()
+    return w, st
+
+
+class TestPagedViewer(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.out = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _load(self, rel_path):
+        with open(os.path.join(self.out, rel_path)) as f:
+            return json.load(f)
+
+    def test_small_tree_inlined(self):
+        _, st = _list_reader(3)
+        path = structure_to_paged_viewer(st, self.out)
+        manifest = self._load("manifest.json")
+        self.assertEqual(path, os.path.join(self.out, "manifest.json"))
+        self.assertIn("FIELDS", manifest["root"])
+        self.assertNotIn("PAGES", manifest["root"])
+        self.assertEqual(manifest["data_size"], 5)
+
+    def test_big_list_paged(self):
+        _, st = _list_reader(25)
+        structure_to_paged_viewer(st, self.out, page_items=10, inline_nodes=8, chunk_size=16)
+        manifest = self._load("manifest.json")
+        records = None
+        for page in manifest["root"]["PAGES"]:
+            for name, node in self._load(page["href"])["FIELDS"]:
+                if name == "records":
+                    records = node
+        self.assertIsNotNone(records)
+        pages = records["PAGES"]
+        self.assertEqual([p["count"] for p in pages], [10, 10, 5])
+        self.assertEqual(pages[1]["first"], 10)
+        self.assertEqual(pages[1]["POS"], 12)
+        items = self._load(pages[2]["href"])["ITEMS"]
+        self.assertEqual(len(items), 5)
+        self.assertEqual(items[0]["CLASS"], "Rec")
+        self.assertNotIn("data_hex", items[0]["FIELDS"][0][1])
+
+    def test_data_chunks(self):
+        w, st = _list_reader(40)
+        structure_to_paged_viewer(st, self.out, chunk_size=16)
+        manifest = self._load("manifest.json")
+        blob = b""
+        for rel_path in manifest["chunks"]:
+            with open(os.path.join(self.out, rel_path), "rb") as f:
+                blob += f.read()
+        self.assertEqual(blob, st.get_data())
+        self.assertEqual(len(manifest["chunks"]), 3)
+
+    def test_data_from_wire(self):
+        w, st = _list_reader(4)
+        w.goto(3)
+        structure_to_paged_viewer(st, self.out, source=w, chunk_size=64)
+        manifest = self._load("manifest.json")
+        self.assertEqual(manifest["data_size"], len(w.dump()))
+        self.assertEqual(w.get_pos(), 3)
+
+    def test_gaps_default_to_wire(self):
+        data = bytes(range(64))
+        w = Wire(from_bytes=data)
+        st = StructureReader(w)
+        st.will_read("head").read_word()
+        w.goto(10)
+        st.will_read("body").read_dword()
+        st.will_read("back")
+        w.peek(2, at=2)
+        structure_to_paged_viewer(st, self.out, chunk_size=16)
+        manifest = self._load("manifest.json")
+        blob = b""
+        for rel_path in manifest["chunks"]:
+            with open(os.path.join(self.out, rel_path), "rb") as f:
+                blob += f.read()
+        # chunks hold the data at its stream offsets, not the recorded reads back to back
+        self.assertEqual(blob, data)
+        self.assertEqual(w.get_pos(), 14)
+
+
+if __name__ == "__main__":
+    unittest.main()
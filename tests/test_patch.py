@@ -0,0 +1,144 @@
+import os
+import random
+import tempfile
+import tracemalloc
+import unittest
+from bytewirez import PatchOverlay, SharedStore, Wire
+
+BASE = bytes(range(256)) * 16
+
+
+class TestPatchOverlay(unittest.TestCase):
+    def test_read_merges_patches(self):
+        w = Wire.from_patched(BASE)
+        w.goto(10)
+        w.write(b"\xAA\xBB")
+        w.goto(8)
+        self.assertEqual(w.read(6), bytes([8, 9, 0xAA, 0xBB, 12, 13]))
+        self.assertEqual(w.peek(2, at=0), b"\x00\x01")
+
+    def test_random_against_bytearray(self):
+        rnd = random.Random(7)
+        ov = PatchOverlay(BASE)
+        expected = bytearray(BASE)
+        for _ in range(300):
+            at = rnd.randrange(0, len(BASE) + 40)
+            data = bytes(rnd.randrange(256) for _ in range(rnd.randrange(1, 30)))
+            ov.patch(at, data)
+            if at > len(expected):
+                expected += bytes(at - len(expected))
+            expected[at:at + len(data)] = data
+            for _ in range(3):
+                lo = rnd.randrange(0, len(expected))
+                n = rnd.randrange(1, 100)
+                self.assertEqual(ov.read_at(lo, n), bytes(expected[lo:lo + n]))
+        ranges = ov.dirty_ranges()
+        self.assertEqual(ranges, sorted(ranges))
+        self.assertTrue(all(a[1] < b[0] for a, b in zip(ranges, ranges[1:])))
+
+    def test_undo_and_discard(self):
+        ov = PatchOverlay(BASE)
+        w = ov.wire()
+        w.goto(4)
+        w.write_dword(0x11223344)
+        w.goto(6)
+        w.write_dword(0x55667788)
+        self.assertEqual(ov.dirty_ranges(), [(4, 10)])
+        ov.undo()
+        self.assertEqual(w.peek(4, at=4), b"\x11\x22\x33\x44")
+        self.assertEqual(ov.dirty_ranges(), [(4, 8)])
+        ov.undo()
+        self.assertFalse(ov.dirty)
+        self.assertEqual(w.peek(6, at=4), BASE[4:10])
+        with self.assertRaises(IndexError):
+            ov.undo()
+        w.goto(0)
+        w.write(b"xx")
+        ov.discard()
+        self.assertEqual(w.peek(2, at=0), BASE[:2])
+
+    def test_sequential_writes_memory(self):
+        # consecutive writes must not recopy the growing patched run
+        ov = PatchOverlay(BASE)
+        w = ov.wire()
+        tracemalloc.start()
+        try:
+            for i in range(20000):
+                w.write_dword(i)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 16 << 20)
+        self.assertEqual(ov.dirty_ranges(), [(0, 80000)])
+        self.assertEqual(w.peek(8, at=4 * 1234), (1234).to_bytes(4, "big") + (1235).to_bytes(4, "big"))
+        ov.undo()
+        self.assertEqual(ov.dirty_ranges(), [(0, 79996)])
+
+    def test_grow(self):
+        ov = PatchOverlay(b"abc")
+        ov.patch(5, b"Z")
+        w = ov.wire()
+        self.assertEqual(w.get_size(), 6)
+        self.assertEqual(w.read(), b"abc\x00\x00Z")
+        ov.undo()
+        self.assertEqual(w.get_size(), 3)
+
+
+class TestPatchCommit(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, "wb") as f:
+            f.write(BASE)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def _read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_commit_in_place(self):
+        for use_mmap in (False, True):
+            ov = PatchOverlay.open(self.path, use_mmap=use_mmap)
+            ov.patch(100, b"patched")
+            ov.patch(len(BASE) + 2, b"!")
+            ov.commit()
+            self.assertFalse(ov.dirty)
+            data = self._read(self.path)
+            self.assertEqual(data[100:107], b"patched")
+            self.assertEqual(data[len(BASE):], b"\x00\x00!")
+            self.assertEqual(ov.wire().peek(7, at=100), b"patched")
+            ov.close()
+            with open(self.path, "wb") as f:
+                f.write(BASE)
+
+    def test_commit_into_new_file(self):
+        out = self.path + ".out"
+        try:
+            with PatchOverlay.open(self.path) as ov:
+                ov.patch(0, b"\xff")
+                ov.commit(into=out)
+                self.assertTrue(ov.dirty)
+            self.assertEqual(self._read(out), b"\xff" + BASE[1:])
+            self.assertEqual(self._read(self.path), BASE)
+        finally:
+            os.unlink(out)
+
+    def test_shared_store_left_open(self):
+        with SharedStore.from_file(self.path) as store:
+            with PatchOverlay(store) as ov:
+                ov.patch(0, b"\xff")
+                self.assertEqual(ov.read_at(0, 2), b"\xff" + BASE[1:2])
+            # the store belongs to the caller and is still usable
+            self.assertEqual(store.pread(4, 0), BASE[:4])
+            with self.assertRaises(ValueError):
+                PatchOverlay(store).commit()
+            self.assertEqual(store.cursor().read(4), BASE[:4])
+
+    def test_commit_needs_path(self):
+        with self.assertRaises(ValueError):
+            PatchOverlay(BASE).commit()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import io
+import struct
+import sys
+import unittest
+from bytewirez import Wire, StructureReader, ENDIAN_LITTLE
+
+
+def _records_reader(count):
+    w = Wire(from_bytes=struct.pack(">H", count) + b"\x01\x00\x02\x03" * count)
+    st = StructureReader(w)
+    st.will_read("count").read_word()
+    st.will_read("records")
+    with st.start_list():
+        for _ in range(count):
+            with st.start_object(class_name="Rec"):
+                st.will_read("a").read_byte()
+                st.will_read("b").read_byte()
+                st.will_read("c").read_word()
+    return st
+
+
+class TestImHexOutput(unittest.TestCase):
+    def test_identical_records_deduplicated(self):
+        out = _records_reader(100).output_imHex()
+        self.assertEqual(out.count("struct Rec "), 1)
+        self.assertIn("Rec records[100];", out)
+
+    def test_type_mapping(self):
+        w = Wire(from_bytes=b"\x00" * 32)
+        st = StructureReader(w)
+        st.will_read("s").read_sword()
+        st.will_read("f").read_fmt("f")
+        st.will_read("d").read_fmt("d")
+        st.will_read("q").read_sqword()
+        st.will_read("name").read_fmt("4s")
+        out = st.output_imHex()
+        self.assertIn("be s16 s;", out)
+        self.assertIn("be float f;", out)
+        self.assertIn("be double d;", out)
+        self.assertIn("be s64 q;", out)
+        self.assertIn("char name[4];", out)
+
+    def test_little_endian(self):
+        w = Wire(from_bytes=b"\x00" * 4)
+        w.set_endian(ENDIAN_LITTLE)
+        st = StructureReader(w)
+        st.will_read("v").read_dword()
+        self.assertIn("le u32 v;", st.output_imHex())
+
+    def test_multi_value_format(self):
+        w = Wire(from_bytes=b"\x00" * 12)
+        st = StructureReader(w)
+        st.will_read("a").read_fmt("IBB")
+        st.will_read("b").read_fmt("IBB")
+        out = st.output_imHex()
+        self.assertEqual(out.count("struct FORMAT__"), 1)
+        self.assertIn("be u32 v0;", out)
+
+    def test_heterogeneous_list(self):
+        w = Wire(from_bytes=b"\x00" * 3)
+        st = StructureReader(w)
+        st.will_read("items")
+        with st.start_list():
+            w.read_byte()
+            w.read_word()
+        out = st.output_imHex()
+        self.assertIn("struct ARRAY__", out)
+        self.assertIn("be u16 ITEM_1;", out)
+
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+class TestKaitaiOutput(unittest.TestCase):
+    def test_returns_text(self):
+        out = _records_reader(3).output_kaitai()
+        self.assertTrue(out.startswith("meta:\n  id: bytewirez_trace\n"))
+
+    def test_into_file(self):
+        f = io.StringIO()
+        self.assertIsNone(_records_reader(3).output_kaitai(into_file=f, ksy_id="MyFormat"))
+        self.assertIn("id: my_format", f.getvalue())
+
+    @unittest.skipIf(yaml is None, "PyYAML not installed")
+    def test_structure(self):
+        ksy = yaml.safe_load(_records_reader(50).output_kaitai())
+        self.assertEqual(list(ksy["types"]), ["rec"])
+        self.assertEqual(ksy["types"]["rec"]["seq"][2], {"id": "c", "type": "u2be"})
+        records = ksy["seq"][1]
+        self.assertEqual(records["type"], "rec")
+        self.assertEqual(records["repeat"], "expr")
+        self.assertEqual(records["repeat-expr"], 50)
+
+    @unittest.skipIf(yaml is None, "PyYAML not installed")
+    def test_formats(self):
+        w = Wire(from_bytes=b"\x00" * 32)
+        w.set_endian(ENDIAN_LITTLE)
+        st = StructureReader(w)
+        st.will_read("f").read_fmt("f")
+        st.will_read("name").read_fmt("4s")
+        st.will_read("pair").read_fmt("2H")
+        st.will_read("raw").read(3)
+        seq = yaml.safe_load(st.output_kaitai())["seq"]
+        self.assertEqual(seq[0], {"id": "f", "type": "f4le"})
+        self.assertEqual(seq[1], {"id": "name", "size": 4})
+        self.assertEqual(seq[2], {"id": "pair", "type": "u2le", "repeat": "expr", "repeat-expr": 2})
+        self.assertEqual(seq[3], {"id": "raw", "size": 3})
+
+    @unittest.skipIf(yaml is None, "PyYAML not installed")
+    def test_duplicate_names(self):
+        w = Wire(from_bytes=bytes(8))
+        st = StructureReader(w)
+        st.will_read("Foo").read_byte()
+        st.will_read("foo").read_byte()
+        st.will_read("foo").read_byte()
+        st.will_read("foo_2").read_byte()
+        ids = [f["id"] for f in yaml.safe_load(st.output_kaitai())["seq"]]
+        self.assertEqual(ids, ["foo", "foo_2", "foo_3", "foo_2_2"])
+
+    @unittest.skipIf(yaml is None, "PyYAML not installed")
+    def test_gaps_and_out_of_order(self):
+        w = Wire(from_bytes=bytes(64))
+        st = StructureReader(w)
+        st.will_read("a").read_word()
+        w.goto(8)
+        st.will_read("b").read_word()
+        # follow()-style read of a target further on, then back to where we were
+        w.follow(0x20, lambda wire: st.will_read("target").read_dword())
+        st.will_read("c").read_byte()
+        w.goto(0)
+        st.will_read("again").read_byte()
+        ksy = yaml.safe_load(st.output_kaitai())
+        self.assertEqual([f["id"] for f in ksy["seq"]], ["a", "gap", "b", "c"])
+        self.assertEqual(ksy["seq"][1], {"id": "gap", "size": 6})
+        self.assertEqual(ksy["instances"]["target"], {"pos": 0x20, "type": "u4be"})
+        self.assertEqual(ksy["instances"]["again"], {"pos": 0, "type": "u1"})
+
+    @unittest.skipIf(yaml is None, "PyYAML not installed")
+    def test_native_formats_get_byte_order(self):
+        w = Wire(from_bytes=bytes(32))
+        st = StructureReader(w)
+        st.will_read("n").read_fmt("@H")
+        st.will_read("s").read_fmt("=I")
+        st.will_read("pair").read_fmt("@BI")
+        ksy = yaml.safe_load(st.output_kaitai())
+        order = "le" if sys.byteorder == "little" else "be"
+        self.assertEqual(ksy["seq"][0]["type"], "u2" + order)
+        self.assertEqual(ksy["seq"][1]["type"], "u4" + order)
+        pair = ksy["types"][ksy["seq"][2]["type"]]["seq"]
+        self.assertEqual(pair[1], {"id": "pad_1", "size": struct.calcsize("@BI") - 5})
+        self.assertEqual(pair[2]["type"], "u4" + order)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import io
+import struct
+import unittest
+from bytewirez import RecordLayout, RecordList, SharedStore, StructureReader, Wire, ENDIAN_LITTLE, fmt_fields
+
+COUNT = 1000
+DATA = b"".join(struct.pack(">IHB4s", i, i % 65536, i % 256, b"r%03d" % (i % 1000)) for i in range(COUNT))
+
+
+class TestFmtFields(unittest.TestCase):
+    def test_offsets(self):
+        self.assertEqual(fmt_fields(">I2H4s"), (">", [(0, "I"), (4, "H"), (6, "H"), (8, "4s")]))
+        self.assertEqual(fmt_fields("<B3xI")[1], [(0, "B"), (4, "I")])
+
+    def test_native_alignment(self):
+        endian, fields = fmt_fields("BI")
+        self.assertEqual(fields[1][0], struct.calcsize("BI") - struct.calcsize("I"))
+
+    def test_native_layout_decodes_natively(self):
+        data = struct.pack("BI", 1, 2)
+        for fmt in ("BI", "@BI", "=BI"):
+            rec = RecordLayout.from_fmt(fmt, ["a", "b"]).record(struct.pack(fmt, 1, 2))
+            self.assertEqual((rec.a, rec.b), (1, 2))
+        self.assertEqual(RecordLayout.from_fmt("BI").size, len(data))
+
+
+class TestRecords(unittest.TestCase):
+    def setUp(self):
+        self.layout = RecordLayout.from_fmt(">IHB4s", ["id", "port", "flag", "tag"])
+
+    def test_lazy_decode_and_cache(self):
+        rec = self.layout.record(DATA, 11 * 5)
+        self.assertFalse(hasattr(rec, "_c_id"))
+        self.assertEqual(rec.id, 5)
+        self.assertEqual(rec._c_id, 5)
+        self.assertFalse(hasattr(rec, "_c_tag"))
+        self.assertEqual(rec.tag, b"r005")
+        self.assertEqual(rec.to_dict(), {"id": 5, "port": 5, "flag": 5, "tag": b"r005"})
+        with self.assertRaises(AttributeError):
+            rec.id = 3
+        with self.assertRaises(AttributeError):
+            rec.other = 1
+
+    def test_list_indexing(self):
+        records = RecordList(self.layout, DATA)
+        self.assertEqual(len(records), COUNT)
+        self.assertEqual(records[777].id, 777)
+        self.assertEqual(records[-1].id, COUNT - 1)
+        self.assertEqual([r.id for r in records[10:20:5]], [10, 15])
+        self.assertEqual([r.id for r in records[3:0:-1]], [3, 2, 1])
+        self.assertEqual(records.column("flag")[:3], [0, 1, 2])
+        with self.assertRaises(IndexError):
+            records[COUNT]
+
+    def test_explicit_layout(self):
+        layout = RecordLayout([("flag", "B", 6), ("id", "<I", 0)], size=11, endian=ENDIAN_LITTLE)
+        rec = layout.record(DATA, 11)
+        self.assertEqual(rec.flag, 1)
+        self.assertEqual(rec.id, 0x01000000)
+        with self.assertRaises(ValueError):
+            RecordLayout([("id", "I", 8)], size=4)
+        with self.assertRaises(ValueError):
+            RecordLayout([("raw", "I", 0)])
+
+    def test_names_like_unpack_ex(self):
+        layout = RecordLayout.from_fmt(">IH", ["a", None])
+        self.assertEqual(layout.names, ["a"])
+        self.assertEqual(layout.size, 6)
+        self.assertEqual(RecordLayout.from_fmt(">IH").names, ["field_0", "field_1"])
+        with self.assertRaises(struct.error):
+            RecordLayout.from_fmt(">I", ["a", "b"])
+
+    def test_wire_read_records(self):
+        w = Wire.from_bytes(DATA)
+        w.goto(11)
+        records = w.read_records("IHB4s", 10, into=["id", "port", "flag", "tag"])
+        self.assertEqual(w.get_pos(), 11 * 11)
+        self.assertEqual(records[9].id, 10)
+        # zero copy: the records point into the BytesIO buffer
+        self.assertIsInstance(records._buf, memoryview)
+        with self.assertRaises(EOFError):
+            w.read_records("IHB4s", COUNT)
+        del records
+
+    def test_read_hooks_see_records(self):
+        w = Wire.from_bytes(DATA)
+        r = StructureReader(w)
+        with w.digest("crc32") as d:
+            records = r.will_read("recs").read_records(self.layout, 5)
+            w.read_word()
+        self.assertEqual(records[4].id, 4)
+        self.assertEqual(d.size, 5 * 11 + 2)
+        items = r.get_root_element().items
+        self.assertEqual([name for name, _ in items], ["recs", "item_00001"])
+        self.assertEqual(items[0][1].raw, DATA[:55])
+        self.assertEqual(r.get_data(), DATA[:57])
+
+    def test_wire_endian(self):
+        w = Wire.from_bytes(b"\x01\x00\x02\x00")
+        w.set_endian(ENDIAN_LITTLE)
+        self.assertEqual([r.v for r in w.read_records("H", 2, into=["v"])], [1, 2])
+
+    def test_cursor_and_file_wires(self):
+        c = SharedStore.from_buffer(DATA).cursor(pos=22)
+        self.assertEqual(c.read_records(self.layout, 1)[0].id, 2)
+        w = Wire.from_fd(io.BufferedReader(io.BytesIO(DATA)))
+        self.assertEqual(w.read_records(self.layout, 3)[2].tag, b"r002")
+        self.assertEqual(w.get_pos(), 33)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import re
+import unittest
+from bytewirez import Wire, MultiPatternScanner
+
+BLOB = b"xxMZ..PE..MZ\x90\x00PE" + b"\x00" * 50 + b"MZab" + b"zzzz" * 10 + b"aaaa"
+
+
+class TestFind(unittest.TestCase):
+    def test_find_literal(self):
+        w = Wire.from_bytes(BLOB)
+        self.assertEqual(w.find(b"MZ"), 2)
+        self.assertEqual(w.find(b"MZ", start=3), 10)
+        self.assertIsNone(w.find(b"nope"))
+        self.assertEqual(w.get_pos(), 0)
+
+    def test_find_from_current_pos(self):
+        w = Wire.from_bytes(BLOB)
+        w.goto(5)
+        self.assertEqual(w.find(b"MZ"), 10)
+
+    def test_find_all_across_chunks(self):
+        w = Wire.from_bytes(BLOB)
+        expected = [m.start() for m in re.finditer(b"(?=MZ)", BLOB)]
+        for chunk in (3, 4, 7, 1 << 20):
+            self.assertEqual(list(w.find_all(b"MZ", chunk_size=chunk)), expected)
+
+    def test_find_all_overlapping(self):
+        w = Wire.from_bytes(b"aaaaa")
+        self.assertEqual(list(w.find_all(b"aa", chunk_size=2)), [0, 1, 2, 3])
+
+    def test_find_all_end(self):
+        w = Wire.from_bytes(BLOB)
+        self.assertEqual(list(w.find_all(b"MZ", start=0, end=11)), [2])
+        self.assertEqual(list(w.find_all(b"MZ", start=0, end=12)), [2, 10])
+
+    def test_hex_wildcards(self):
+        w = Wire.from_bytes(BLOB)
+        self.assertEqual(list(w.find_all("4D 5A ?? ??", chunk_size=5)), [2, 10, 66])
+        self.assertEqual(w.find("4D5A9000"), 10)
+
+    def test_regex(self):
+        w = Wire.from_bytes(BLOB)
+        self.assertEqual(list(w.find_all(re.compile(b"PE"))), [6, 14])
+
+    def test_hex_grouped_tokens(self):
+        w = Wire.from_bytes(b"xxxxxMZ!")
+        self.assertEqual(list(w.find_all("4D5A ??", chunk_size=6)), [5])
+        self.assertEqual(list(w.find_all("4D 5A ??", chunk_size=6)), [5])
+
+    def test_regex_across_chunks_reported_once(self):
+        w = Wire.from_bytes(b"a" * 10 + b"b" + b"a" * 2)
+        self.assertEqual(list(w.find_all(re.compile(b"a+"), chunk_size=3)), [0, 11])
+
+
+class TestMultiPattern(unittest.TestCase):
+    def test_scan_dict(self):
+        w = Wire.from_bytes(BLOB)
+        found = list(w.scan({"mz": b"MZ", "pe": b"PE", "aaa": b"aaa"}, chunk_size=4))
+        self.assertEqual(found, [(2, "mz"), (6, "pe"), (10, "mz"), (14, "pe"), (66, "mz"), (110, "aaa"), (111, "aaa")])
+
+    def test_nested_patterns(self):
+        scanner = MultiPatternScanner([b"he", b"she", b"his", b"hers"])
+        found = sorted(scanner.feed(b"ushers"))
+        self.assertEqual(found, [(1, 1), (2, 0), (2, 3)])
+
+    def test_feed_in_pieces(self):
+        scanner = MultiPatternScanner({"x": b"abcd"})
+        self.assertEqual(list(scanner.feed(b"zzab")), [])
+        self.assertEqual(list(scanner.feed(b"cdab")), [(2, "x")])
+
+    def test_empty_pattern(self):
+        with self.assertRaises(ValueError):
+            MultiPatternScanner([b""])
+
+
+if __name__ == "__main__":
+    unittest.main()
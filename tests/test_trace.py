@@ -0,0 +1,135 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from bytewirez import (
+    Wire, StructureReader, custom_json_serializer, encode_varint, decode_varint,
+    load_trace, parse_trace, structure_to_trace, trace_to_json, trace_to_html_viewer, structure_to_html_viewer,
+)
+
+DATA = bytes.fromhex('11223344 2222 2222 fefe 1234 12345678 88 99 f1 f2 f3')
+
+
+def _sample_reader():
+    w = Wire(from_bytes=DATA)
+    st = StructureReader(w)
+    st.will_read("field1").read(4)
+    st.will_read("field01", "field02").read(2)
+    w.read(2)
+    st.will_read("field2").read_word()
+    with st.will_read("obj1").start_object(class_name='FooClass'):
+        st.will_read("ob1_field1").read_word()
+        st.will_read("many_fields").read_fmt("IBB")
+        with st.will_read("array1").start_list():
+            for _ in range(3):
+                w.read(1)
+    return st
+
+
+class TestVarint(unittest.TestCase):
+    def test_roundtrip(self):
+        for v in (0, 1, 127, 128, 300, 2 ** 32, 2 ** 63 + 5):
+            self.assertEqual(decode_varint(encode_varint(v)), (v, len(encode_varint(v))))
+
+    def test_wire_methods(self):
+        w = Wire.empty()
+        w.write_varint(300)
+        w.write_varint(5)
+        self.assertEqual(w.dump(), b'\xac\x02\x05')
+        w.goto_begin()
+        self.assertEqual(w.read_varint(), 300)
+        self.assertEqual(w.read_varint(), 5)
+
+    def test_negative(self):
+        with self.assertRaises(ValueError):
+            encode_varint(-1)
+
+
+class TestTrace(unittest.TestCase):
+    def test_roundtrip_bytes(self):
+        st = _sample_reader()
+        out = io.BytesIO()
+        structure_to_trace(st, out)
+        loaded = load_trace(out.getvalue(), data=DATA)
+        self.assertEqual(
+            custom_json_serializer(loaded.get_root_element()),
+            custom_json_serializer(st.get_root_element()),
+        )
+
+    def test_smaller_than_json(self):
+        st = _sample_reader()
+        out = io.BytesIO()
+        structure_to_trace(st, out)
+        self.assertLess(len(out.getvalue()) * 4, len(custom_json_serializer(st.get_root_element())))
+
+    def test_file_and_converters(self):
+        st = _sample_reader()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.bin")
+            structure_to_trace(st, path)
+            data = json.loads(trace_to_html_viewer(path, data=DATA))
+            self.assertEqual(data, json.loads(structure_to_html_viewer(st)))
+            tree = json.loads(trace_to_json(path))
+            self.assertEqual(tree["FIELDS"][4][1]["CLASS"], "FooClass")
+
+    def test_many_nodes(self):
+        w = Wire(from_bytes=bytes(3000))
+        st = StructureReader(w)
+        with st.will_read("items").start_list():
+            for _ in range(1000):
+                with st.start_object(class_name="Rec"):
+                    st.will_read("a").read_byte()
+                    st.will_read("b").read_word()
+        out = io.BytesIO()
+        structure_to_trace(st, out)
+        root = load_trace(out.getvalue()).get_root_element()
+        items = root.items[0][1].items
+        self.assertEqual(len(items), 1000)
+        self.assertEqual(items[999].items[1][0], "b")
+        self.assertEqual(items[999].items[1][1].pos, 2998)
+        self.assertEqual(root.size, 3000)
+
+    def test_lazy_decoding(self):
+        st = _sample_reader()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.bin")
+            structure_to_trace(st, path)
+            with load_trace(path, data=DATA) as loaded:
+                root = loaded.get_root_element()
+                self.assertIsNone(root._items)
+                obj = root.items[4][1]
+                # the object itself is not decoded until its fields are accessed
+                self.assertIsNone(obj._items)
+                self.assertEqual(obj.class_name, "FooClass")
+                self.assertEqual(obj.items[2][1].items[1].raw, b"\xf2")
+                nodes = list(loaded.iter_nodes())
+            with open(path, "rb") as f:
+                eager = parse_trace(f.read(), DATA)
+        self.assertEqual(custom_json_serializer(root), custom_json_serializer(eager))
+        self.assertEqual(len(nodes), 12)
+        self.assertEqual([(d, n) for d, n, _ in nodes[4:7]], [(1, "field2"), (1, "obj1"), (2, "ob1_field1")])
+        self.assertEqual(nodes[-1][2].pos, 20)
+
+    def test_lazy_out_of_order_access(self):
+        # strings are defined on first use; reading later siblings first must still work
+        w = Wire(from_bytes=bytes(40))
+        st = StructureReader(w)
+        for i in range(4):
+            with st.will_read(f"o{i}").start_object(class_name=f"C{i}"):
+                st.will_read(f"f{i}").read_word()
+        out = io.BytesIO()
+        structure_to_trace(st, out)
+        root = load_trace(out.getvalue()).get_root_element()
+        self.assertEqual(root.items[3][1].items[0][0], "f3")
+        self.assertEqual(root.items[1][1].items[0][0], "f1")
+        self.assertEqual(root.items[1][1].class_name, "C1")
+        self.assertEqual(root.items[0][1].items[0][1].pos, 0)
+
+    def test_bad_magic(self):
+        with self.assertRaises(ValueError):
+            load_trace(b"NOPE\x01\x00")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import io
+import struct
+import unittest
+from bytewirez import SlidingWindow, StructureReader, Wire, WindowError
+
+RECORDS = 5000
+DATA = b"".join(struct.pack(">HI", 4, i) for i in range(RECORDS))
+
+
+class Trickle(io.RawIOBase):
+    """Non-seekable stream returning at most `step` bytes per read."""
+    def __init__(self, data: bytes, step: int = 7):
+        self._data = data
+        self._pos = 0
+        self._step = step
+
+    def readable(self):
+        return True
+
+    def read(self, n=-1):
+        n = self._step if n is None or n < 0 else min(n, self._step)
+        out = self._data[self._pos:self._pos + n]
+        self._pos += len(out)
+        return out
+
+
+class TestSlidingWindow(unittest.TestCase):
+    def test_sequential_bounded(self):
+        win = SlidingWindow(Trickle(DATA), window=256, read_chunk=64)
+        w = win.wire()
+        peak = 0
+        for i in range(RECORDS):
+            size, value = w.read_fmt("HI")
+            self.assertEqual((size, value), (4, i))
+            peak = max(peak, len(win._buf))
+        self.assertLessEqual(peak, 256 + 64)
+        self.assertEqual(w.read(10), b"")
+
+    def test_peek_pushd_within_window(self):
+        w = Wire.from_stream(Trickle(DATA), window=1024)
+        w.read(60)
+        w.pushd()
+        w.goto(12)
+        self.assertEqual(w.read_fmt("HI"), (4, 2))
+        w.popd()
+        self.assertEqual(w.peek(6, at=0), DATA[:6])
+        self.assertEqual(w.get_pos(), 60)
+
+    def test_discarded_access(self):
+        win = SlidingWindow(io.BytesIO(DATA), window=1 << 16)
+        w = win.wire()
+        w.read(600)
+        win.commit()
+        self.assertEqual(win.start, 600)
+        with self.assertRaises(WindowError):
+            w.goto(10)
+        with self.assertRaises(WindowError):
+            w.peek(2, at=0)
+        self.assertEqual(w.get_pos(), 600)
+        win.discard_before(700)
+        with self.assertRaises(IndexError):
+            w.read(1)
+
+    def test_peek_beyond_window(self):
+        w = Wire.from_stream(io.BytesIO(DATA), window=128, read_chunk=16)
+        self.assertEqual(w.read(6), DATA[:6])
+        with self.assertRaises(WindowError):
+            w.peek(6, at=600)
+        self.assertEqual(w.get_pos(), 6)
+        w.pushd()
+        with self.assertRaises(WindowError):
+            w.goto(600)
+        w.popd()
+        self.assertEqual(w.read(6), DATA[6:12])
+        self.assertEqual(w.peek(6, at=100), DATA[100:106])
+
+    def test_several_wires_hold(self):
+        win = SlidingWindow(io.BytesIO(DATA), window=128, read_chunk=16)
+        first = win.wire()
+        second = win.wire()
+        first.read(6)
+        first.pushd()
+        # the second Wire must not drop the position saved by the first one
+        with self.assertRaises(WindowError):
+            second.goto(600)
+        first.popd()
+        self.assertEqual(first.read(6), DATA[6:12])
+        win.release(first._pos_stack)
+        second.goto(600)
+        self.assertEqual(second.read_fmt("HI"), (4, 100))
+
+    def test_skip_ahead(self):
+        win = SlidingWindow(Trickle(DATA, step=1000), window=128, read_chunk=16)
+        w = win.wire()
+        w.goto(6 * 4000)
+        self.assertEqual(w.read_fmt("HI"), (4, 4000))
+        self.assertLessEqual(len(win._buf), 1000)
+
+
+class TestStructureReaderSink(unittest.TestCase):
+    def test_sink_flushes_top_level(self):
+        w = Wire.from_stream(Trickle(DATA), window=512)
+        seen = []
+        r = StructureReader(w, sink=lambda name, item: seen.append((name, item)))
+        for i in range(100):
+            with r.start_object("Record"):
+                r.will_read("size", "value").read_fmt("HI")
+            r.will_read("raw").read(0)
+            self.assertEqual(len(r.get_root_element().items), 0)
+        self.assertEqual(len(seen), 200)
+        name, rec = seen[-2]
+        self.assertEqual(rec.class_name, "Record")
+        self.assertEqual(rec.items[0][1].raw, DATA[99 * 6:99 * 6 + 6])
+        self.assertEqual(seen[-1][0], "raw")
+        self.assertEqual(r.get_data(), b"")
+
+    def test_sink_default_names(self):
+        w = Wire.from_bytes(DATA[:12])
+        seen = []
+        StructureReader(w, sink=lambda name, item: seen.append(name))
+        for _ in range(3):
+            w.read_word()
+        self.assertEqual(seen, ["item_00000", "item_00001", "item_00002"])
+
+    def test_without_sink_unchanged(self):
+        w = Wire.from_bytes(DATA[:12])
+        r = StructureReader(w)
+        with r.start_object():
+            w.read_fmt("HI")
+        w.read_fmt("HI")
+        self.assertEqual(len(r.get_root_element().items), 2)
+        self.assertEqual(r.get_data(), DATA[:12])
+
+
+if __name__ == "__main__":
+    unittest.main()